@@ -1,23 +1,63 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+import os
+import sys
+
+# Add parent directory to path for config import
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import config
+
+# Threading knobs must be in the environment before TensorFlow/OpenMP initialize.
+# Small-batch inference is dominated by thread-pool fan-out, so keep pools small
+# and scale out with Gunicorn workers instead.
+os.environ.setdefault('TF_NUM_INTRAOP_THREADS', str(config.TF_THREADS))
+os.environ.setdefault('TF_NUM_INTEROP_THREADS', str(config.TF_THREADS))
+os.environ.setdefault('OMP_NUM_THREADS', str(config.TF_THREADS))
+os.environ.setdefault('KMP_BLOCKTIME', '0')
+os.environ.setdefault('KMP_AFFINITY', 'granularity=fine,compact,1,0')
+
+# These pull in numpy, shap/sklearn and numba's OpenMP runtime, so they must stay below
+# the environment block above or the thread settings arrive too late to take effect
+from api.batching import DynamicBatcher
+from api.explain import make_kernel_explainer
+
 import tensorflow as tf
+import tf2onnx
+import onnxruntime as ort
+from onnxruntime.quantization import quantize_dynamic, QuantType
 import joblib
 import numpy as np
-import os
-import sys
+import orjson
+import json
 import logging
+import threading
+import tempfile
+import time
 import shap
+from functools import lru_cache
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import traceback
 
-# Add parent directory to path for config import
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import config
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, used by jsonify and request.get_json"""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_SORT_KEYS).decode()
+    
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # orjson rejects the NaN/Infinity literals the stdlib accepts; parse those
+            # the old way so validation still reports them as non-finite features
+            return json.loads(s)
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config['SECRET_KEY'] = config.SECRET_KEY
 
 # Set up rate limiting
@@ -38,6 +78,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+try:
+    tf.config.threading.set_intra_op_parallelism_threads(config.TF_THREADS)
+    tf.config.threading.set_inter_op_parallelism_threads(config.TF_THREADS)
+except RuntimeError as e:
+    # TensorFlow was already initialized by an earlier import; keep its pools
+    logger.warning(f"Could not set TensorFlow thread pools: {str(e)}")
+
 # Validate configuration
 config_errors = config.validate()
 if config_errors:
@@ -46,36 +93,58 @@ if config_errors:
     if config.is_production:
         raise RuntimeError("Configuration validation failed in production")
 
-def validate_features_input(data: Dict[str, Any]) -> tuple[bool, str, np.ndarray]:
+# Number of input features expected by the model (log_return, volatility, ma_5, ma_10, rsi)
+NUM_FEATURES = 5
+
+def validate_features_array(features: np.ndarray) -> tuple[bool, str, Optional[np.ndarray]]:
+    """Validate a parsed features array and return status, error message, and features array"""
+    # Validate shape
+    if features.ndim != 2:
+        return False, 'Features must be a 2D array', None
+    
+    # Validate batch size
+    if features.shape[0] > config.MAX_PREDICTION_BATCH_SIZE:
+        return False, f'Batch size exceeds maximum of {config.MAX_PREDICTION_BATCH_SIZE}', None
+    
+    # Validate feature count (should match training data)
+    if features.shape[1] != NUM_FEATURES:
+        return False, f'Expected {NUM_FEATURES} features, got {features.shape[1]}', None
+    
+    # Check for NaN or infinite values in a single pass, after the cheap shape checks
+    if not np.isfinite(features).all():
+        return False, 'Features contain NaN or infinite values', None
+    
+    return True, '', features
+
+def validate_features_input(data: Dict[str, Any]) -> tuple[bool, str, Optional[np.ndarray]]:
     """Validate features input and return status, error message, and features array"""
     if not data or 'features' not in data:
         return False, 'Missing features in request', None
     
     try:
-        features = np.array(data['features'])
-        
-        # Validate shape
-        if features.ndim != 2:
-            return False, 'Features must be a 2D array', None
-        
-        # Validate batch size
-        if features.shape[0] > config.MAX_PREDICTION_BATCH_SIZE:
-            return False, f'Batch size exceeds maximum of {config.MAX_PREDICTION_BATCH_SIZE}', None
-        
-        # Validate feature count (should match training data)
-        expected_features = 5  # log_return, volatility, ma_5, ma_10, rsi
-        if features.shape[1] != expected_features:
-            return False, f'Expected {expected_features} features, got {features.shape[1]}', None
-        
-        # Check for NaN or infinite values
-        if np.any(np.isnan(features)) or np.any(np.isinf(features)):
-            return False, 'Features contain NaN or infinite values', None
-        
-        return True, '', features
+        # Parse straight to float32, the dtype the scaler constants and model use
+        features = np.asarray(data['features'], dtype=np.float32)
+        return validate_features_array(features)
         
     except Exception as e:
         return False, f'Invalid features format: {str(e)}', None
 
+def parse_binary_features(body: bytes, shape_header: str) -> tuple[bool, str, Optional[np.ndarray]]:
+    """Parse a raw row-major float32 feature matrix described by an X-Shape: rows,cols header"""
+    if not shape_header:
+        return False, 'Missing X-Shape header', None
+    
+    try:
+        rows, cols = (int(dim) for dim in shape_header.split(','))
+    except ValueError:
+        return False, 'X-Shape header must be "rows,cols"', None
+    
+    if rows < 0 or cols < 0 or len(body) != rows * cols * np.dtype(np.float32).itemsize:
+        return False, f'Body size does not match X-Shape {rows},{cols} of float32 values', None
+    
+    features = np.frombuffer(body, dtype=np.float32).reshape(rows, cols)
+    return validate_features_array(features)
+
 @app.route('/')
 def api_info():
     """API information endpoint"""
@@ -87,64 +156,280 @@ def api_info():
             '/': 'API info',
             '/health': 'Health check',
             '/predict': 'POST: Predict volatility (expects JSON {"features": [[...], ...]})',
-            '/explain': 'POST: Get SHAP feature attributions (expects JSON {"features": [[...], ...]})',
+            '/predict_bin': 'POST: Predict volatility from raw float32 bytes (header X-Shape: rows,cols)',
+            '/explain': 'POST: Get SHAP feature attributions (expects JSON {"features": [[...], ...]}, optional ?method=deep|kernel)',
             '/metrics': 'GET: Model performance metrics'
         },
         'rate_limits': {
             'default': '200 per day, 50 per hour',
             'predict': '100 per hour',
+            'predict_bin': '100 per hour',
             'explain': '50 per hour'
         }
     })
 
 # Load model and scaler at startup
 def load_model_and_scaler():
-    """Load ML model and scaler with error handling"""
+    """Load ML model and scaler constants with error handling"""
     try:
         logger.info(f"Loading model from {config.MODEL_PATH}")
         model = tf.keras.models.load_model(config.MODEL_PATH)
         
-        logger.info(f"Loading scaler from {config.SCALER_PATH}")
-        scaler = joblib.load(config.SCALER_PATH)
+        scaler_affine = load_scaler_affine()
         
         logger.info("Model and scaler loaded successfully")
-        return model, scaler
+        return model, scaler_affine
     except Exception as e:
         logger.error(f"Failed to load model or scaler: {str(e)}")
         raise
 
+def quantize_onnx_int8(onnx_model) -> bytes:
+    """Quantize Dense weights to INT8 (dynamic activation quantization) and return the serialized model"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        quantized_path = os.path.join(tmp_dir, 'volatility_model_int8.onnx')
+        quantize_dynamic(onnx_model, quantized_path, weight_type=QuantType.QInt8)
+        with open(quantized_path, 'rb') as f:
+            return f.read()
+
+def build_onnx_session(keras_model):
+    """
+    Export the Keras model to ONNX and open an ONNX Runtime session for serving.
+    Returns None if the export fails, in which case inference falls back to Keras.
+    """
+    try:
+        input_signature = (tf.TensorSpec((None, NUM_FEATURES), tf.float32, name='features'),)
+        serving_fn = tf.function(lambda x: keras_model(x, training=False), input_signature=input_signature)
+        onnx_model, _ = tf2onnx.convert.from_function(serving_fn, input_signature=input_signature, opset=17)
+        
+        if config.MODEL_PRECISION == 'int8':
+            onnx_bytes = quantize_onnx_int8(onnx_model)
+        else:
+            onnx_bytes = onnx_model.SerializeToString()
+        
+        sess_options = ort.SessionOptions()
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        sess_options.intra_op_num_threads = config.TF_THREADS
+        session = ort.InferenceSession(
+            onnx_bytes,
+            sess_options=sess_options,
+            providers=['CPUExecutionProvider']
+        )
+        logger.info(f"ONNX Runtime session created ({config.MODEL_PRECISION})")
+        return session
+    except Exception as e:
+        logger.warning(f"ONNX export failed, serving with Keras instead: {str(e)}")
+        return None
+
+def build_keras_infer(keras_model):
+    """
+    Compile the Keras forward pass with XLA for serving when ONNX Runtime is unavailable.
+    XLA compiles once per concrete batch size, so callers should pad to a bucket size.
+    """
+    input_dtype = tf.as_dtype(keras_model.inputs[0].dtype)
+    
+    @tf.function(input_signature=[tf.TensorSpec((None, NUM_FEATURES), input_dtype)], jit_compile=True)
+    def keras_infer(x):
+        return keras_model(x, training=False)
+    return keras_infer
+
+def _batch_bucket(rows: int) -> int:
+    """Round a batch size up to the next power of two to bound XLA recompilations"""
+    return 1 << max(rows - 1, 0).bit_length()
+
+# Batch sizes pre-run at startup outside development; with power-of-two padding
+# these cover the XLA buckets most requests land in
+WARMUP_BATCH_SIZES = (1, 8, 32, 64, 256, config.MAX_PREDICTION_BATCH_SIZE)
+
+def warm_up_model():
+    """
+    Run predictions through each inference path so graph tracing and
+    kernel selection happen at startup rather than on the first request
+    """
+    warmup_features = np.zeros((1, NUM_FEATURES), dtype=np.float32)
+    keras_infer(tf.constant(warmup_features, dtype=keras_infer.input_signature[0].dtype))
+    scale_features(warmup_features)
+
+    batch_sizes = (1,) if config.is_development else WARMUP_BATCH_SIZES
+    for batch_size in batch_sizes:
+        run_inference(np.zeros((batch_size, NUM_FEATURES), dtype=np.float32))
+    logger.info(f"Model warm-up complete for batch sizes {batch_sizes}")
+
+# ONNX tensor element types we may see on the exported model input
+ONNX_INPUT_DTYPES = {
+    'tensor(float)': np.float32,
+    'tensor(float16)': np.float16,
+    'tensor(double)': np.float64,
+}
+
+def onnx_input_spec(session) -> tuple[str, type]:
+    """Name and NumPy dtype of the session's input, resolved once rather than per call"""
+    model_input = session.get_inputs()[0]
+    return model_input.name, ONNX_INPUT_DTYPES.get(model_input.type, np.float32)
+
+def build_scaler_affine(mean: np.ndarray, inv_scale: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fold scaler statistics into float32 constants so that
+    (x - mean) / scale becomes x * inv_scale + offset
+    """
+    inv_scale = np.asarray(inv_scale, dtype=np.float32)
+    offset = (-np.asarray(mean, dtype=np.float64) * inv_scale).astype(np.float32)
+    return inv_scale, offset
+
+def load_scaler_affine() -> tuple[np.ndarray, np.ndarray]:
+    """
+    Load the scaler as (inv_scale, offset) constants.
+    Training writes mean.npy and scale_inv.npy next to the joblib scaler; model
+    directories without them fall back to unpickling the StandardScaler.
+    """
+    scaler_dir = os.path.dirname(config.SCALER_PATH)
+    mean_path = os.path.join(scaler_dir, 'mean.npy')
+    scale_inv_path = os.path.join(scaler_dir, 'scale_inv.npy')
+    if os.path.exists(mean_path) and os.path.exists(scale_inv_path):
+        logger.info(f"Loading scaler constants from {scaler_dir}")
+        return build_scaler_affine(np.load(mean_path), np.load(scale_inv_path))
+    
+    logger.info(f"Loading scaler from {config.SCALER_PATH}")
+    fitted_scaler = joblib.load(config.SCALER_PATH)
+    return build_scaler_affine(fitted_scaler.mean_, 1.0 / fitted_scaler.scale_)
+
+def build_explainers(keras_model):
+    """
+    Build SHAP explainers once at startup instead of per request.
+    DeepExplainer backpropagates through the Keras model; the kernel explainer is
+    kept as a model-agnostic fallback and enumerates every coalition from masks
+    precomputed here (sampling only for wide feature sets). The all-zeros
+    background is the training mean in scaled feature space.
+    """
+    background = np.zeros((1, NUM_FEATURES), dtype=np.float32)
+    explainers = {'kernel': make_kernel_explainer(run_inference, background)}
+    try:
+        explainers['deep'] = shap.DeepExplainer(keras_model, background)
+    except Exception as e:
+        logger.warning(f"DeepExplainer unavailable, falling back to KernelExplainer: {str(e)}")
+    return explainers
+
+def scale_features(features: np.ndarray) -> np.ndarray:
+    """Standardize features with the precomputed scaler constants"""
+    assert scaler_inv_scale is not None and scaler_offset is not None, 'scaler not loaded'
+    scaled = np.multiply(features, scaler_inv_scale, dtype=np.float32)
+    scaled += scaler_offset
+    return scaled
+
+def run_inference(features_scaled: np.ndarray) -> np.ndarray:
+    """Run the model on scaled features, using ONNX Runtime when available and XLA-compiled Keras otherwise"""
+    if ort_session is not None:
+        # copy=False: requests are already float32, so no per-call conversion copy
+        features_scaled = features_scaled.astype(ort_input_dtype, copy=False)
+        return ort_session.run(None, {ort_input_name: features_scaled})[0]
+    assert keras_infer is not None, 'model not loaded'
+    rows = features_scaled.shape[0]
+    input_dtype = keras_infer.input_signature[0].dtype.as_numpy_dtype
+    padded = np.zeros((_batch_bucket(rows), NUM_FEATURES), dtype=input_dtype)
+    padded[:rows] = features_scaled
+    return keras_infer(tf.constant(padded)).numpy()[:rows]
+
+model: Optional[tf.keras.Model] = None
+ort_session: Optional[ort.InferenceSession] = None
+keras_infer: Any = None  # tf.function from build_keras_infer
+ort_input_name: Optional[str] = None
+ort_input_dtype: type = np.float32
+scaler_inv_scale: Optional[np.ndarray] = None
+scaler_offset: Optional[np.ndarray] = None
+explainers: Dict[str, Any] = {}
 try:
-    model, scaler = load_model_and_scaler()
+    model, (scaler_inv_scale, scaler_offset) = load_model_and_scaler()
+    keras_infer = build_keras_infer(model)
+    ort_session = build_onnx_session(model)
+    if ort_session is not None:
+        ort_input_name, ort_input_dtype = onnx_input_spec(ort_session)
+    warm_up_model()
+    explainers = build_explainers(model)
 except Exception as e:
     logger.critical(f"Critical error during startup: {str(e)}")
     if config.is_production:
         raise
 
+EXPLAIN_METHODS = ('deep', 'kernel')
+
+# SHAP explainers keep per-call state on the instance, so calls must not overlap
+explainer_lock = threading.Lock()
+
+@lru_cache(maxsize=config.SHAP_CACHE_SIZE)
+def _cached_shap_values(method: str, features_bytes: bytes, num_rows: int) -> np.ndarray:
+    features_scaled = np.frombuffer(features_bytes, dtype=np.float32).reshape(num_rows, NUM_FEATURES)
+    with explainer_lock:
+        return np.asarray(explainers[method].shap_values(features_scaled))
+
+def compute_shap_values(features_scaled: np.ndarray, method: str = 'deep') -> np.ndarray:
+    """SHAP values for scaled features, memoized on the method and raw feature bytes"""
+    features_scaled = np.ascontiguousarray(features_scaled, dtype=np.float32)
+    return _cached_shap_values(method, features_scaled.tobytes(), features_scaled.shape[0])
+
+# Concurrent /predict requests are coalesced into a single inference call
+batcher = DynamicBatcher(
+    lambda features: run_inference(scale_features(features)),
+    max_batch_requests=config.BATCH_MAX_REQUESTS
+)
+
+def check_prediction() -> Dict[str, Any]:
+    """Run a dummy prediction through the serving path and report model status"""
+    model_status = model is not None and scaler_inv_scale is not None
+    
+    test_features = np.array([[0.01, 0.02, 100.0, 101.0, 50.0]], dtype=np.float32)
+    try:
+        test_scaled = scale_features(test_features)
+        run_inference(test_scaled)
+        prediction_status = True
+    except Exception:
+        prediction_status = False
+    
+    return {
+        'model_loaded': model_status,
+        'prediction_working': prediction_status,
+        'checked_at': datetime.utcnow().isoformat()
+    }
+
+# Single-entry TTL cache of (expires_at, check result); monitors poll /health far
+# more often than the model state can change
+_health_cache: Tuple[float, Optional[Dict[str, Any]]] = (0.0, None)
+_health_cache_lock = threading.Lock()
+
+def get_health_state() -> tuple[Dict[str, Any], bool, float]:
+    """Return the health check result, whether it came from the cache, and its remaining TTL"""
+    global _health_cache
+    expires_at, state = _health_cache
+    now = time.monotonic()
+    if state is not None and now < expires_at:
+        return state, True, expires_at - now
+    with _health_cache_lock:
+        # Another request may have refreshed the entry while we waited for the lock
+        expires_at, state = _health_cache
+        now = time.monotonic()
+        if state is not None and now < expires_at:
+            return state, True, expires_at - now
+        state = check_prediction()
+        _health_cache = (time.monotonic() + config.HEALTH_CACHE_TTL, state)
+        return state, False, config.HEALTH_CACHE_TTL
+
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Comprehensive health check endpoint"""
+    """Health check endpoint, re-running the prediction check at most once per HEALTH_CACHE_TTL"""
     try:
-        # Check model availability
-        model_status = model is not None and scaler is not None
-        
-        # Check if we can make a dummy prediction
-        test_features = np.array([[0.01, 0.02, 100.0, 101.0, 50.0]])
-        try:
-            test_scaled = scaler.transform(test_features)
-            test_pred = model.predict(test_scaled, verbose=0)
-            prediction_status = True
-        except Exception:
-            prediction_status = False
+        state, cache_hit, ttl_remaining = get_health_state()
+        health_status = state['model_loaded'] and state['prediction_working']
         
-        health_status = model_status and prediction_status
-        
-        return jsonify({
+        response = jsonify({
             'status': 'healthy' if health_status else 'unhealthy',
             'timestamp': datetime.utcnow().isoformat(),
-            'model_loaded': model_status,
-            'prediction_working': prediction_status,
+            'model_loaded': state['model_loaded'],
+            'prediction_working': state['prediction_working'],
+            'last_checked': state['checked_at'],
             'version': '1.0.0'
-        }), 200 if health_status else 503
+        })
+        response.status_code = 200 if health_status else 503
+        response.headers['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+        response.headers['Cache-Control'] = f'max-age={int(ttl_remaining)}'
+        return response
         
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
@@ -172,12 +457,10 @@ def predict():
         return jsonify({'error': error_msg}), 400
     
     try:
-        # Scale features
-        features_scaled = scaler.transform(features)
-        
-        # Make predictions
-        preds = model.predict(features_scaled, verbose=0)
-        preds = preds.flatten().tolist()
+        # Scale features and make predictions as part of a shared batch
+        preds = batcher.predict(features, timeout=config.PREDICTION_TIMEOUT)
+        # orjson serializes the NumPy buffer directly, no per-element Python floats
+        preds = preds.reshape(-1)
         
         # Log successful prediction
         processing_time = (datetime.utcnow() - start_time).total_seconds()
@@ -198,17 +481,61 @@ def predict():
             'timestamp': start_time.isoformat()
         }), 500
 
+@app.route('/predict_bin', methods=['POST'])
+@limiter.limit("100 per hour")
+def predict_bin():
+    """
+    Predict volatility for a raw float32 feature matrix, skipping JSON encoding
+    Expects: application/octet-stream body of row-major float32 values, header X-Shape: rows,cols
+    Returns: application/octet-stream body of float32 predictions, header X-Shape: rows
+    """
+    start_time = datetime.utcnow()
+    
+    # Validate input
+    is_valid, error_msg, features = parse_binary_features(request.get_data(), request.headers.get('X-Shape'))
+    if not is_valid:
+        logger.warning(f"Invalid binary prediction request: {error_msg}")
+        return jsonify({'error': error_msg}), 400
+    
+    try:
+        preds = batcher.predict(features, timeout=config.PREDICTION_TIMEOUT)
+        preds = np.ascontiguousarray(preds, dtype=np.float32).reshape(-1)
+        
+        processing_time = (datetime.utcnow() - start_time).total_seconds()
+        logger.info(f"Binary prediction successful: {len(preds)} predictions in {processing_time:.3f}s")
+        
+        return Response(preds.tobytes(), mimetype='application/octet-stream', headers={
+            'X-Shape': str(len(preds)),
+            'X-Processing-Time': f'{processing_time:.6f}',
+            'X-Model-Version': '1.0.0'
+        })
+        
+    except Exception as e:
+        logger.error(f"Binary prediction failed: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            'error': 'Internal server error during prediction',
+            'timestamp': start_time.isoformat()
+        }), 500
+
 @app.route('/explain', methods=['POST'])
 @limiter.limit("50 per hour")
 def explain():
     """
     Generate SHAP explanations for predictions
     Expects JSON: {"features": [[...], [...], ...]}
-    Returns: {"predictions": [...], "shap_values": [[...], ...], "feature_names": [...]}
+    Optional query parameter: ?method=deep (default) or ?method=kernel
+    The kernel method visits all 2**M coalitions when M <= 8 features (exact
+    Shapley values, 32 coalitions for the 5 model features); wider inputs use sampled
+    KernelSHAP with nsamples = 2*M + 2048
+    Returns: {"predictions": [...], "shap_values": [[...], ...], "feature_names": [...], "method": "..."}
     """
     start_time = datetime.utcnow()
     data = request.get_json()
     
+    method = request.args.get('method', 'deep')
+    if method not in EXPLAIN_METHODS:
+        return jsonify({'error': f'Unknown explanation method: {method}. Use one of {list(EXPLAIN_METHODS)}'}), 400
+    
     # Validate input
     is_valid, error_msg, features = validate_features_input(data)
     if not is_valid:
@@ -220,16 +547,14 @@ def explain():
         return jsonify({'error': 'Maximum 10 samples allowed for explanations'}), 400
     
     try:
-        features_scaled = scaler.transform(features)
+        features_scaled = scale_features(features)
         
-        # Create SHAP explainer with minimal background
-        background = np.zeros((1, features_scaled.shape[1]))
-        explainer = shap.KernelExplainer(model.predict, background)
-        
-        # Generate SHAP values
-        shap_vals = explainer.shap_values(features_scaled, nsamples=100)
-        preds = model.predict(features_scaled, verbose=0).flatten().tolist()
-        shap_vals = np.array(shap_vals).tolist()
+        # Generate SHAP values with the shared explainer
+        if method not in explainers:
+            method = 'kernel'
+        shap_vals = compute_shap_values(features_scaled, method)
+        preds = run_inference(features_scaled).reshape(-1)
+        shap_vals = np.ascontiguousarray(shap_vals)
         
         # Feature names
         feature_names = ['log_return', 'volatility', 'ma_5', 'ma_10', 'rsi']
@@ -241,6 +566,7 @@ def explain():
             'predictions': preds,
             'shap_values': shap_vals,
             'feature_names': feature_names,
+            'method': method,
             'timestamp': start_time.isoformat(),
             'processing_time_seconds': processing_time
         })
@@ -270,8 +596,13 @@ def get_metrics():
         system_info = {
             'python_version': sys.version.split()[0],
             'tensorflow_version': tf.__version__,
+            'onnxruntime_version': ort.__version__,
+            'inference_backend': 'onnxruntime' if ort_session is not None else 'keras',
+            'model_precision': config.MODEL_PRECISION if ort_session is not None else 'fp32',
+            'tf_intra_op_threads': tf.config.threading.get_intra_op_parallelism_threads(),
+            'tf_inter_op_threads': tf.config.threading.get_inter_op_parallelism_threads(),
             'model_loaded': model is not None,
-            'scaler_loaded': scaler is not None
+            'scaler_loaded': scaler_inv_scale is not None
         }
         
         return jsonify({
@@ -295,10 +626,27 @@ def internal_error(error):
     logger.error(f"Internal server error: {str(error)}")
     return jsonify({'error': 'Internal server error'}), 500
 
+# Cache-Control per endpoint: info and metrics only change on restart, predictions must never be reused
+CACHEABLE_PATHS = {'/', '/metrics'}
+NO_STORE_PATHS = {'/predict', '/predict_bin', '/explain'}
+
+@app.after_request
+def set_cache_headers(response):
+    """Let clients and proxies briefly cache static GET responses, and never cache predictions"""
+    if request.path in NO_STORE_PATHS:
+        response.headers['Cache-Control'] = 'no-store'
+    elif request.path in CACHEABLE_PATHS and response.status_code == 200:
+        response.headers['Cache-Control'] = 'public, max-age=10'
+    return response
+
 if __name__ == '__main__':
     # Ensure logs directory exists
     os.makedirs('logs', exist_ok=True)
     
+    if config.is_production:
+        logger.warning("Flask development server is not meant for production; "
+                       "run: gunicorn -c gunicorn.conf.py api.app:app")
+    
     # Run the application
     app.run(
         host=config.API_HOST,
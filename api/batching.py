@@ -0,0 +1,96 @@
+"""
+Dynamic batching for model inference
+Coalesces concurrent prediction requests into a single model call
+"""
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+
+class DynamicBatcher:
+    """
+    Queue feature blocks from concurrent requests and run them through the model together.
+
+    A background thread takes the first pending request plus whatever else is already
+    queued (up to max_batch_requests), stacks them into one array, runs a single
+    inference and scatters the rows back to each caller. It never waits for more
+    requests: a lone request runs at once, and requests that arrive while the model
+    is busy queue up and form the next batch.
+    """
+
+    def __init__(self, infer_fn: Callable[[np.ndarray], np.ndarray],
+                 max_batch_requests: int = 64):
+        self._infer_fn = infer_fn
+        self._max_batch_requests = max(1, max_batch_requests)
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+
+    def submit(self, features: np.ndarray) -> Future:
+        """Queue a 2D feature block and return a future resolving to its predictions"""
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((features, future))
+        return future
+
+    def predict(self, features: np.ndarray, timeout: Optional[float] = None) -> np.ndarray:
+        """Submit features and block until their predictions are ready"""
+        return self.submit(features).result(timeout=timeout)
+
+    def _worker_running(self) -> bool:
+        return (self._worker is not None and self._worker.is_alive()
+                and self._worker_pid == os.getpid())
+
+    def _ensure_worker(self):
+        """Start the batching thread on first use in each process (threads don't survive fork)"""
+        if self._worker_running():
+            return
+        with self._lock:
+            if self._worker_running():
+                return
+            if self._worker_pid != os.getpid():
+                self._queue = queue.Queue()
+            self._worker = threading.Thread(target=self._run, name='inference-batcher', daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def _collect_batch(self) -> List[Tuple[np.ndarray, Future]]:
+        batch = [self._queue.get()]
+        # Close the batch as soon as nothing else is pending
+        while len(batch) < self._max_batch_requests:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            batch = [(features, future) for features, future in batch
+                     if future.set_running_or_notify_cancel()]
+            if batch:
+                self._process(batch)
+
+    def _process(self, batch: List[Tuple[np.ndarray, Future]]):
+        try:
+            if len(batch) == 1:
+                stacked = batch[0][0]
+            else:
+                stacked = np.vstack([features for features, _ in batch])
+            preds = self._infer_fn(stacked)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        offset = 0
+        for features, future in batch:
+            rows = features.shape[0]
+            future.set_result(preds[offset:offset + rows])
+            offset += rows
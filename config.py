@@ -27,8 +27,14 @@ class Config:
     # Model Configuration
     MODEL_PATH: str = os.getenv('MODEL_PATH', 'model/saved_model/volatility_model.keras')
     SCALER_PATH: str = os.getenv('SCALER_PATH', 'model/saved_model/scaler.save')
+    MODEL_PRECISION: str = os.getenv('MODEL_PRECISION', 'fp32')  # fp32 or int8
     MAX_PREDICTION_BATCH_SIZE: int = int(os.getenv('MAX_PREDICTION_BATCH_SIZE', '1000'))
     MODEL_RETRAIN_INTERVAL: int = int(os.getenv('MODEL_RETRAIN_INTERVAL', '86400'))
+    TF_THREADS: int = int(os.getenv('TF_THREADS', '1'))
+    BATCH_MAX_REQUESTS: int = int(os.getenv('BATCH_MAX_REQUESTS', '64'))
+    PREDICTION_TIMEOUT: float = float(os.getenv('PREDICTION_TIMEOUT', '30'))
+    SHAP_CACHE_SIZE: int = int(os.getenv('SHAP_CACHE_SIZE', '256'))
+    HEALTH_CACHE_TTL: float = float(os.getenv('HEALTH_CACHE_TTL', '30'))
     
     # Database Configuration
     DATABASE_URL: Optional[str] = os.getenv('DATABASE_URL')
@@ -72,6 +78,9 @@ class Config:
         """Validate configuration and return list of errors"""
         errors = []
         
+        if self.MODEL_PRECISION not in ('fp32', 'int8'):
+            errors.append(f"MODEL_PRECISION must be 'fp32' or 'int8', got '{self.MODEL_PRECISION}'")
+        
         if self.is_production:
             if self.SECRET_KEY == 'dev-key-change-in-production':
                 errors.append("SECRET_KEY must be changed in production")
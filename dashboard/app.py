@@ -1,31 +1,52 @@
 import dash
-from dash import html, dcc, Input, Output, State, dash_table, ctx
+from dash import html, dcc, Input, Output, State, Patch, ctx
 import dash_bootstrap_components as dbc
-import pandas as pd
+import numpy as np
+import orjson
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import plotly.graph_objs as go
 import base64
-import io
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 import sys
 from datetime import datetime
 import logging
+import logging.handlers
+import queue
+import atexit
 
 # Add parent directory to path for config import
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import config
 
-# Configure logging
+# Configure logging: callbacks only enqueue records, a background listener does the file/console writes
+# (the logs directory must exist at import time when served by gunicorn)
+os.makedirs('logs', exist_ok=True)
+log_queue = queue.Queue(-1)
 logging.basicConfig(
     level=getattr(logging, config.LOG_LEVEL.upper()),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/dashboard.log'),
-        logging.StreamHandler()
-    ]
+    handlers=[logging.handlers.QueueHandler(log_queue)]
 )
+log_listener = logging.handlers.QueueListener(
+    log_queue,
+    logging.FileHandler('logs/dashboard.log'),
+    logging.StreamHandler()
+)
+log_listener.start()
+atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
+# Reuse keep-alive connections to the API across callbacks instead of a new TCP connection per request.
+# The dashboard only talks to one API host; pool_maxsize bounds concurrent callbacks sharing it
+session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=2, backoff_factor=0.1))
+session.mount('http://', _adapter)
+session.mount('https://', _adapter)
+
 # Dash will automatically load any CSS in the 'assets' folder in the same directory as this file.
 # Place custom styles in dashboard/assets/custom.css
 app = dash.Dash(
@@ -35,6 +56,32 @@ app = dash.Dash(
     update_title=None,
     suppress_callback_exceptions=True
 )
+# Underlying Flask app for WSGI servers: gunicorn dashboard.app:server
+server = app.server
+
+# The prediction chart is laid out once; callbacks only patch the trace data
+BASE_LAYOUT = dict(
+    title='Predicted Volatility',
+    xaxis_title='Index',
+    yaxis_title='Volatility',
+    plot_bgcolor='#fff',
+    paper_bgcolor='#fff',
+    font=dict(family='Inter, Segoe UI, Arial, sans-serif', size=15),
+    margin=dict(l=40, r=40, t=60, b=40),
+    hovermode='x unified',
+    height=420,
+)
+BASE_FIGURE = go.Figure(
+    [go.Scatter(x=[], y=[], mode='lines+markers', name='Predicted Volatility', line=dict(color='#007bff'))],
+    layout=BASE_LAYOUT
+)
+
+def volatility_patch(x, y):
+    """Partial figure update replacing only the prediction trace's points"""
+    patch = Patch()
+    patch['data'][0]['x'] = x
+    patch['data'][0]['y'] = y
+    return patch
 
 # Logo placeholder (replace src with your logo if available)
 logo = html.Img(src='https://upload.wikimedia.org/wikipedia/commons/6/6b/Bitmap_Icon_Logo.png', height='48px', style={'marginRight': '16px'})
@@ -50,8 +97,8 @@ FEATURE_OPTIONS = [
 
 app.layout = html.Div([
     dcc.Store(id='theme-store', data='light-mode'),
-    dcc.Store(id='table-data-store'),
     dcc.Store(id='last-pred-features'),
+    dcc.Store(id='shap-cache'),
     dbc.Container([
         dbc.Row([
             dbc.Col([
@@ -128,7 +175,7 @@ app.layout = html.Div([
             dbc.Col([
                 html.Hr(style={'margin': '2rem 0 1rem 0', 'borderColor': '#e9ecef'}),
                 html.Div(id='output-table', style={'marginBottom': '2rem'}),
-                dcc.Graph(id='volatility-graph', config={'displayModeBar': False}, style={'borderRadius': '12px', 'boxShadow': '0 1px 8px rgba(0,0,0,0.04)', 'background': '#fff'}),
+                dcc.Graph(id='volatility-graph', figure=BASE_FIGURE, config={'displayModeBar': False}, style={'borderRadius': '12px', 'boxShadow': '0 1px 8px rgba(0,0,0,0.04)', 'background': '#fff'}),
                 html.Div(id='shap-explanation', style={'marginTop': '2rem'}),
             ], width=12)
         ]),
@@ -151,156 +198,154 @@ def toggle_theme(is_dark, current):
     return 'light-mode', 'light-mode'
 
 @app.callback(
-    [Output('output-table', 'children'), Output('volatility-graph', 'figure'), Output('loading-output', 'children'), Output('table-data-store', 'data'), Output('last-pred-features', 'data')],
+    [Output('output-table', 'children'), Output('volatility-graph', 'figure'), Output('loading-output', 'children'), Output('last-pred-features', 'data')],
     [Input('predict-btn', 'n_clicks')],
     [State('upload-data', 'contents'), State('horizon-dropdown', 'value'), State('feature-dropdown', 'value')]
 )
 def update_output(n_clicks, contents, horizon, features):
     if not n_clicks:
-        return '', go.Figure(), '', None, None
+        return '', dash.no_update, '', None
     if contents is None:
-        return dbc.Alert('Please upload a CSV file.', color='warning'), go.Figure(), '', None, None
-    content_type, content_string = contents.split(',')
+        return dbc.Alert('Please upload a CSV file.', color='warning'), volatility_patch([], []), '', None
+    content_type, content_string = contents.split(',', 1)
     decoded = base64.b64decode(content_string)
     try:
-        df = pd.read_csv(io.StringIO(decoded.decode('utf-8')))
+        # PyArrow parses the CSV bytes in C++ across threads; BufferReader wraps the decoded bytes without copying
+        table = pacsv.read_csv(
+            pa.BufferReader(decoded),
+            read_options=pacsv.ReadOptions(use_threads=True),
+            # Parse model features straight to the float32 the API expects
+            convert_options=pacsv.ConvertOptions(column_types={f: pa.float32() for f in features})
+        )
+        df = table.to_pandas()
     except Exception as e:
-        return dbc.Alert(f'Error reading CSV: {e}', color='danger'), go.Figure(), '', None, None
+        return dbc.Alert(f'Error reading CSV: {e}', color='danger'), volatility_patch([], []), '', None
     missing = [f for f in features if f not in df.columns]
     if missing:
-        return dbc.Alert(f'Missing features in uploaded data: {missing}', color='danger'), go.Figure(), '', None, None
-    X = df[features].values.tolist()
+        return dbc.Alert(f'Missing features in uploaded data: {missing}', color='danger'), volatility_patch([], []), '', None
+    X = df[features].to_numpy(dtype=np.float32, copy=False)
     try:
         logger.info(f"Making prediction request with {len(X)} samples")
-        response = requests.post(f'{config.API_URL}/predict', json={'features': X}, timeout=30)
+        # Send the feature matrix as raw float32 bytes instead of JSON lists
+        response = session.post(
+            f'{config.API_URL}/predict_bin',
+            data=X.tobytes(),
+            headers={'Content-Type': 'application/octet-stream', 'X-Shape': f'{X.shape[0]},{X.shape[1]}'},
+            timeout=30
+        )
         if response.status_code == 200:
-            result = response.json()
-            preds = result['predictions']
+            preds = np.frombuffer(response.content, dtype=np.float32)
             df['Predicted Volatility'] = preds
             
             # Log prediction metrics
-            processing_time = result.get('processing_time_seconds', 'N/A')
+            processing_time = response.headers.get('X-Processing-Time', 'N/A')
             logger.info(f"Prediction successful: {len(preds)} predictions in {processing_time}s")
-            # Add Explain buttons
-            explain_buttons = [
-                dbc.Button('Explain', id={'type': 'explain-btn', 'index': i}, color='info', size='sm', style={'margin': '0 4px'})
-                for i in range(len(df))
-            ]
-            table = dash_table.DataTable(
-                data=df.head(10).to_dict('records'),
-                columns=[{'name': i, 'id': i} for i in df.columns] + [{'name': 'Explain', 'id': 'Explain'}],
-                page_size=10,
-                style_table={'overflowX': 'auto', 'borderRadius': '12px', 'boxShadow': '0 1px 8px rgba(0,0,0,0.04)'},
-                style_cell={'textAlign': 'left', 'fontFamily': 'Inter, Segoe UI, Arial, sans-serif', 'fontSize': '1.05rem', 'padding': '8px'},
-                style_header={'backgroundColor': '#f1f3f6', 'fontWeight': 'bold'},
-                row_deletable=False,
-                editable=False,
-                # Add Explain buttons to the table
-                data_previous=df.head(10).to_dict('records'),
+            # Rows shown in the table, offered for explanation and kept in the store
+            preview = df.head(10)
+            table = dbc.Table.from_dataframe(
+                preview,
+                striped=True,
+                hover=True,
+                responsive=True,
+                size='sm',
+                style={'borderRadius': '12px', 'boxShadow': '0 1px 8px rgba(0,0,0,0.04)', 'fontFamily': 'Inter, Segoe UI, Arial, sans-serif'}
             )
-            # Store table data and features for SHAP
+            # One dropdown drives explanations instead of a button per row
+            explain_selector = dcc.Dropdown(
+                id='explain-row',
+                options=[{'label': f'Explain row {i}', 'value': i} for i in range(len(preview))],
+                placeholder='Explain a row...',
+                clearable=True,
+                style={'marginTop': '8px', 'maxWidth': '240px'}
+            )
+            # Store the preview rows' features for SHAP
             return (
-                html.Div([
-                    table,
-                    html.Div([
-                        dbc.Button('Explain', id={'type': 'explain-btn', 'index': i}, color='info', size='sm', style={'margin': '0 4px'})
-                        for i in range(min(10, len(df)))
-                    ], style={'marginTop': '8px'})
-                ]),
-                go.Figure([
-                    go.Scatter(x=df.index, y=df['Predicted Volatility'], mode='lines+markers', name='Predicted Volatility', line=dict(color='#007bff'))
-                ]).update_layout(
-                    title='Predicted Volatility',
-                    xaxis_title='Index',
-                    yaxis_title='Volatility',
-                    plot_bgcolor='#fff',
-                    paper_bgcolor='#fff',
-                    font=dict(family='Inter, Segoe UI, Arial, sans-serif', size=15),
-                    margin=dict(l=40, r=40, t=60, b=40),
-                    hovermode='x unified',
-                    height=420,
-                ),
+                html.Div([table, explain_selector]),
+                volatility_patch(np.arange(len(preds)), preds),
                 '',
-                df.head(10).to_dict('records'),
-                X[:10]
+                X[:len(preview)].tolist()
             )
         else:
             error_msg = f'API Error ({response.status_code}): {response.text}'
             logger.error(error_msg)
-            return dbc.Alert(error_msg, color='danger'), go.Figure(), '', None, None
+            return dbc.Alert(error_msg, color='danger'), volatility_patch([], []), '', None
     except requests.exceptions.Timeout:
         error_msg = 'API request timeout - please try again'
         logger.error(error_msg)
-        return dbc.Alert(error_msg, color='danger'), go.Figure(), '', None, None
+        return dbc.Alert(error_msg, color='danger'), volatility_patch([], []), '', None
     except requests.exceptions.ConnectionError:
         error_msg = f'Cannot connect to API at {config.API_URL}'
         logger.error(error_msg)
-        return dbc.Alert(error_msg, color='danger'), go.Figure(), '', None, None
+        return dbc.Alert(error_msg, color='danger'), volatility_patch([], []), '', None
         
     except Exception as e:
         error_msg = f'Unexpected error: {str(e)}'
         logger.error(error_msg)
-        return dbc.Alert(error_msg, color='danger'), go.Figure(), '', None, None
+        return dbc.Alert(error_msg, color='danger'), volatility_patch([], []), '', None
+
+def shap_figure(shap_vals, feature_names, pred):
+    """Bar chart of one row's SHAP attributions"""
+    fig = go.Figure([
+        go.Bar(x=feature_names, y=np.ravel(shap_vals), marker_color='#3aafa9')
+    ])
+    fig.update_layout(
+        title=f'Feature Attribution for Prediction (Value: {pred:.4f})',
+        xaxis_title='Feature',
+        yaxis_title='SHAP Value',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Nunito, Inter, Segoe UI, Arial, sans-serif', size=15),
+        margin=dict(l=40, r=40, t=60, b=40),
+        height=320,
+    )
+    return fig
 
 @app.callback(
     Output('shap-explanation', 'children'),
-    Input({'type': 'explain-btn', 'index': dash.ALL}, 'n_clicks'),
-    State('table-data-store', 'data'),
+    Output('shap-cache', 'data'),
+    Input('explain-row', 'value'),
     State('last-pred-features', 'data'),
+    State('shap-cache', 'data'),
     prevent_initial_call=True
 )
-def show_shap_explanation(n_clicks_list, table_data, features_data):
-    if not n_clicks_list or not any(n_clicks_list):
-        return ''
-    # Find which button was clicked
-    idx = n_clicks_list.index(max(n_clicks_list))
-    if features_data is None or idx >= len(features_data):
-        return ''
-    # Get features for this row
-    row_features = [features_data[idx]]
+def show_shap_explanation(idx, features_data, shap_cache):
+    if idx is None or features_data is None or idx >= len(features_data):
+        return '', dash.no_update
+    # Explanations for every preview row are fetched together on first use and
+    # cached with the rows they belong to; a new prediction invalidates them
+    if shap_cache is not None and shap_cache['features'] == features_data:
+        data = shap_cache['explanation']
+        return dcc.Graph(figure=shap_figure(data['shap_values'][idx], data['feature_names'], data['predictions'][idx])), dash.no_update
     try:
-        logger.info(f"Making explanation request for row {idx}")
-        response = requests.post(f'{config.API_URL}/explain', json={'features': row_features}, timeout=60)
+        logger.info(f"Making explanation request for {len(features_data)} rows")
+        response = session.post(
+            f'{config.API_URL}/explain',
+            data=orjson.dumps({'features': features_data}),
+            headers={'Content-Type': 'application/json'},
+            timeout=60
+        )
         if response.status_code == 200:
-            data = response.json()
-            shap_vals = data['shap_values'][0]
-            feature_names = data['feature_names']
-            pred = data['predictions'][0]
-            fig = go.Figure([
-                go.Bar(x=feature_names, y=shap_vals, marker_color='#3aafa9')
-            ])
-            fig.update_layout(
-                title=f'Feature Attribution for Prediction (Value: {pred:.4f})',
-                xaxis_title='Feature',
-                yaxis_title='SHAP Value',
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(family='Nunito, Inter, Segoe UI, Arial, sans-serif', size=15),
-                margin=dict(l=40, r=40, t=60, b=40),
-                height=320,
-            )
-            return dcc.Graph(figure=fig)
+            data = orjson.loads(response.content)
+            fig = shap_figure(data['shap_values'][idx], data['feature_names'], data['predictions'][idx])
+            return dcc.Graph(figure=fig), {'features': features_data, 'explanation': data}
         else:
             error_msg = f'API Error ({response.status_code}): {response.text}'
             logger.error(error_msg)
-            return dbc.Alert(error_msg, color='danger')
+            return dbc.Alert(error_msg, color='danger'), dash.no_update
     except requests.exceptions.Timeout:
         error_msg = 'API request timeout - please try again'
         logger.error(error_msg)
-        return dbc.Alert(error_msg, color='danger')
+        return dbc.Alert(error_msg, color='danger'), dash.no_update
     except requests.exceptions.ConnectionError:
         error_msg = f'Cannot connect to API at {config.API_URL}'
         logger.error(error_msg)
-        return dbc.Alert(error_msg, color='danger')
+        return dbc.Alert(error_msg, color='danger'), dash.no_update
     except Exception as e:
         error_msg = f'Unexpected error: {str(e)}'
         logger.error(error_msg)
-        return dbc.Alert(error_msg, color='danger')
+        return dbc.Alert(error_msg, color='danger'), dash.no_update
 
 if __name__ == '__main__':
-    # Ensure logs directory exists
-    os.makedirs('logs', exist_ok=True)
-    
     # Run the dashboard
     app.run(
         host=config.DASH_HOST,
@@ -1,21 +1,74 @@
 import yfinance as yf
 import pandas as pd
+import numpy as np
 import os
  # fetch and preprocess historical market data
-# Save to CSV for later use in model training
-def fetch_and_preprocess(symbol='^GSPC', start='2015-01-01', end='2024-01-01', output_path='data/market_data.csv'):
-    # Download historical data
-    df = yf.download(symbol, start=start, end=end)
+# Save to Parquet for later use in model training
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+def symbol_data_path(symbol, output_dir='data'):
+    """Parquet file for a ticker, e.g. data/GSPC.parquet for ^GSPC"""
+    return os.path.join(output_dir, f"{symbol.lstrip('^').replace('/', '_')}.parquet")
+
+def is_cached(path, start, end):
+    """True if path already holds a download for exactly this date range"""
+    if not os.path.exists(path):
+        return False
+    attrs = pd.read_parquet(path, engine='pyarrow', columns=[]).attrs
+    return attrs.get('start') == start and attrs.get('end') == end
+
+def symbol_frame(raw, symbol):
+    """OHLCV rows for one symbol from a yf.download result with NAs dropped, or None if it is missing"""
+    if isinstance(raw.columns, pd.MultiIndex):
+        if symbol not in raw.columns.get_level_values(0):
+            return None
+        raw = raw[symbol]
+    columns = PRICE_COLUMNS + ['Volume']
+    if not set(columns).issubset(raw.columns):
+        return None
     # Basic preprocessing: keep only relevant columns, drop NAs
-    df = df[['Open', 'High', 'Low', 'Close', 'Volume']].dropna()
-    df.index.name = 'Date'  # Set index name for clarity
-    # Save to CSV, overwrite, with correct header
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    df.to_csv(output_path)
-    print(f"Data saved to {output_path}")
-    return df
+    return raw[columns].dropna()
 
-if __name__ == '__main__':
-    fetch_and_preprocess()
+def fetch_and_preprocess(symbols=('^GSPC',), start='2015-01-01', end='2024-01-01', output_dir='data'):
+    """
+    Download daily OHLCV for each symbol and write one Parquet file per symbol.
+    Symbols already saved for the same date range are skipped; the rest are
+    fetched in a single threaded yf.download call.
+    """
+    if isinstance(symbols, str):
+        symbols = (symbols,)
+    paths = {symbol: symbol_data_path(symbol, output_dir) for symbol in symbols}
+    todo = [symbol for symbol in symbols if not is_cached(paths[symbol], start, end)]
+    for symbol in symbols:
+        if symbol not in todo:
+            print(f"{symbol}: {paths[symbol]} already covers {start} to {end}, skipping")
+    if not todo:
+        return paths
 
+    # Download historical data
+    raw = yf.download(todo, start=start, end=end, threads=True, group_by='ticker')
+    os.makedirs(output_dir, exist_ok=True)
+    failed = []
+    for symbol in todo:
+        df = symbol_frame(raw, symbol)
+        # yfinance logs download errors and returns empty or all-NaN data instead of raising;
+        # writing that would stamp an empty file as cached and skip the symbol from then on
+        if df is None or df.empty:
+            print(f"No data downloaded for {symbol}, nothing written")
+            failed.append(symbol)
+            continue
+        df.columns.name = None
+        df.index.name = 'Date'  # Set index name for clarity
+        # Yahoo quotes prices at float32 precision, so storing them as float32 loses nothing
+        df[PRICE_COLUMNS] = df[PRICE_COLUMNS].astype(np.float32)
+        # Record the requested range so repeat calls can skip the download
+        df.attrs = {'symbol': symbol, 'start': start, 'end': end}
+        # Save to Parquet (columnar, binary floats), overwrite
+        df.to_parquet(paths[symbol], engine='pyarrow', compression='zstd')
+        print(f"Data for {symbol} saved to {paths[symbol]}")
+    if failed:
+        raise RuntimeError(f"Download failed for {', '.join(failed)}")
+    return paths
 
+if __name__ == '__main__':
+    fetch_and_preprocess()
@@ -10,6 +10,7 @@ import time
 import requests
 import webbrowser
 import signal
+import socket
 import os
 from pathlib import Path
 
@@ -51,6 +52,31 @@ def check_port(port, timeout=2):
     except:
         return False
 
+def wait_port(port, timeout=15):
+    """Wait until something accepts TCP connections on a local port"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.settimeout(0.05)
+            if s.connect_ex(('localhost', port)) == 0:
+                return True
+        time.sleep(0.01)
+    return False
+
+def wait_healthy(port, timeout=30):
+    """
+    Wait until /health answers on a local port. The port opening is not enough:
+    Flask's reloader binds it before the reloaded app has loaded the model.
+    """
+    deadline = time.monotonic() + timeout
+    if not wait_port(port, timeout):
+        return False
+    while time.monotonic() < deadline:
+        if check_port(port, timeout=max(0.1, min(2, deadline - time.monotonic()))):
+            return True
+        time.sleep(0.1)
+    return False
+
 def kill_port_processes(port):
     """Kill any processes using the specified port"""
     try:
@@ -83,14 +109,11 @@ def start_api():
     ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
       env={**os.environ, 'API_PORT': '5001'})
     
-    # Wait for API to start
+    # Wait for API to start: probe the socket, then poll /health until the model is up
     print("⏳ Waiting for API to start...")
-    for i in range(15):
-        time.sleep(1)
-        if check_port(5001):
-            print("✅ API started successfully on http://localhost:5001")
-            return True
-        print(f"   Attempt {i+1}/15...")
+    if wait_healthy(5001):
+        print("✅ API started successfully on http://localhost:5001")
+        return True
     
     print("❌ API failed to start")
     return False
@@ -105,15 +128,20 @@ def start_dashboard():
     kill_port_processes(8050)
     time.sleep(1)
     
-    # Start dashboard
+    # Start dashboard under gunicorn so concurrent callbacks don't queue behind each other
     dashboard_process = subprocess.Popen([
-        sys.executable, 'dashboard/app.py'
+        sys.executable, '-m', 'gunicorn',
+        '--bind', '127.0.0.1:8050',
+        '--workers', '4',
+        '--worker-class', 'gthread',
+        '--threads', '4',
+        'dashboard.app:server'
     ], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
       env={**os.environ, 'API_URL': 'http://localhost:5001'})
     
     # Wait for dashboard to start
     print("⏳ Waiting for dashboard to start...")
-    time.sleep(5)
+    wait_port(8050)
     
     # Check if dashboard is accessible
     try:
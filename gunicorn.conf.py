@@ -0,0 +1,32 @@
+"""
+VolatiQ Gunicorn Configuration
+Production server settings for the Flask API
+
+Usage: gunicorn -c gunicorn.conf.py api.app:app
+"""
+import os
+import sys
+from multiprocessing import cpu_count
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from config import config as volatiq_config
+
+bind = f"{volatiq_config.API_HOST}:{volatiq_config.API_PORT}"
+
+# Inference runs in native TF/ONNX Runtime kernels that gevent cannot
+# monkeypatch, so use threaded sync workers rather than greenlets
+workers = int(os.getenv('GUNICORN_WORKERS', str(2 * cpu_count() + 1)))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Each worker loads the model itself. TensorFlow's thread pools do not survive fork(), so a
+# model and DeepExplainer built in a preloaded master hang /explain in the workers
+preload_app = os.getenv('GUNICORN_PRELOAD', 'false').lower() == 'true'
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+loglevel = volatiq_config.LOG_LEVEL.lower()
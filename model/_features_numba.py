@@ -0,0 +1,86 @@
+"""
+Numba kernels for feature engineering
+Single-pass loops over the Close array instead of chained pandas rolling calls
+"""
+import math
+
+import numpy as np
+from numba import njit
+
+RSI_PERIOD = 14
+
+
+@njit(cache=True)
+def compute_all_features(close, horizon=5):
+    """
+    Compute log_return, volatility, ma_5, ma_10 and rsi in one sweep over Close.
+
+    Matches the pandas definitions the model was trained on: volatility is
+    the sample std of log returns over `horizon` days, the moving averages
+    are simple means, and RSI uses 14-day mean gains and losses. Both moving
+    averages are differences of one shared cumulative sum of Close;
+    volatility uses a sliding Welford update of the window mean and squared
+    deviations, which avoids the cancellation of sum-of-squares. Rows before
+    a window fills are NaN.
+
+    Close may be float32 (Yahoo prices are float32-exact); each value is
+    widened to float64 as it is read, so running sums keep full precision.
+    log_return is written straight into a float32 array.
+    """
+    n = close.shape[0]
+    log_return = np.full(n, np.nan, dtype=np.float32)
+    volatility = np.full(n, np.nan)
+    ma_5 = np.full(n, np.nan)
+    ma_10 = np.full(n, np.nan)
+    rsi = np.full(n, np.nan)
+    cum_close = np.zeros(n + 1)
+    # float64 log returns of the current volatility window, indexed by i % horizon
+    lr_window = np.zeros(horizon)
+    gains = np.zeros(n)
+    losses = np.zeros(n)
+
+    lr_mean = 0.0
+    lr_m2 = 0.0
+    sum_gain = 0.0
+    sum_loss = 0.0
+    prev_close = 0.0
+    for i in range(n):
+        price = np.float64(close[i])
+        cum_close[i + 1] = cum_close[i] + price
+        if i >= 4:
+            ma_5[i] = (cum_close[i + 1] - cum_close[i - 4]) / 5
+        if i >= 9:
+            ma_10[i] = (cum_close[i + 1] - cum_close[i - 9]) / 10
+
+        if i > 0:
+            x = math.log(price / prev_close)
+            log_return[i] = x
+            # log_return[0] is NaN, so the window grows over 1..horizon and then slides
+            if i <= horizon:
+                delta = x - lr_mean
+                lr_mean += delta / i
+                lr_m2 += delta * (x - lr_mean)
+            else:
+                dropped = lr_window[i % horizon]
+                prev_mean = lr_mean
+                lr_mean += (x - dropped) / horizon
+                lr_m2 += (x - dropped) * (x - lr_mean + dropped - prev_mean)
+            if i >= horizon:
+                volatility[i] = math.sqrt(max(lr_m2, 0.0) / (horizon - 1))
+
+            lr_window[i % horizon] = x
+
+            delta = price - prev_close
+            gains[i] = delta if delta > 0 else 0.0
+            losses[i] = -delta if delta < 0 else 0.0
+        prev_close = price
+        sum_gain += gains[i]
+        sum_loss += losses[i]
+        if i >= RSI_PERIOD:
+            sum_gain -= gains[i - RSI_PERIOD]
+            sum_loss -= losses[i - RSI_PERIOD]
+        if i >= RSI_PERIOD - 1:
+            rs = (sum_gain / RSI_PERIOD) / (sum_loss / RSI_PERIOD + 1e-9)
+            rsi[i] = 100.0 - 100.0 / (1.0 + rs)
+
+    return log_return, volatility, ma_5, ma_10, rsi
@@ -2,8 +2,10 @@ import pandas as pd
 import numpy as np
 import os
 import sys
+import hashlib
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from model import build_advanced_model
+from _features_numba import compute_all_features
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 import tensorflow as tf
@@ -14,16 +16,14 @@ def compute_features(df, horizon=5):
     Features: log returns, rolling volatility, moving averages, RSI.
     """
     df = df.copy()
-    df['log_return'] = np.log(df['Close'] / df['Close'].shift(1))
-    df['volatility'] = df['log_return'].rolling(window=horizon).std()
-    df['ma_5'] = df['Close'].rolling(window=5).mean()
-    df['ma_10'] = df['Close'].rolling(window=10).mean()
-    # RSI calculation
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / (loss + 1e-9)
-    df['rsi'] = 100 - (100 / (1 + rs))
+    # All five features come from one pass over Close; prices are float32-exact, so halve the bytes
+    close = df['Close'].to_numpy(dtype=np.float32)
+    log_return, volatility, ma_5, ma_10, rsi = compute_all_features(close, horizon)
+    df['log_return'] = log_return
+    df['volatility'] = volatility
+    df['ma_5'] = ma_5
+    df['ma_10'] = ma_10
+    df['rsi'] = rsi
     # Drop rows with NaN values
     df = df.dropna()
     return df
@@ -36,33 +36,129 @@ def compute_target(df, horizon=5):
     realized_vol = future_returns.rolling(window=horizon).std()
     return realized_vol
 
-def prepare_data(df, horizon=5):
+FEATURE_COLUMNS = ['log_return', 'volatility', 'ma_5', 'ma_10', 'rsi']
+FEATURE_CACHE_DIR = 'data/cache'
+FEATURE_CACHE_MAX_FILES = 16
+# Part of every cache file name: bump whenever compute_features or its kernel changes what it
+# produces, so features cached by older code are never reused
+FEATURE_VERSION = 3
+
+def feature_cache_path(df, horizon, cache_dir):
+    """Cache file for a Close series, horizon and feature code version"""
+    close = np.ascontiguousarray(df['Close'].to_numpy(dtype=np.float64))
+    key = hashlib.blake2b(close.tobytes(), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, f'v{FEATURE_VERSION}_{key}_{horizon}.parquet')
+
+def evict_feature_cache(cache_dir, max_files=FEATURE_CACHE_MAX_FILES):
+    """Drop the least recently used cache files beyond max_files (hits refresh mtime)"""
+    paths = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith('.parquet')]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths[max_files:]:
+        os.remove(path)
+
+def prepare_data(df, horizon=5, cache_dir=None):
+    """
+    Build the feature matrix and target.
+    With cache_dir set, results are memoized as Parquet keyed on the Close column and horizon.
+    """
+    cache_path = feature_cache_path(df, horizon, cache_dir) if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        os.utime(cache_path)
+        cached = pd.read_parquet(cache_path, engine='pyarrow')
+        return cached[FEATURE_COLUMNS].values, cached['target_vol'].values
+
     df = compute_features(df, horizon)
     df['target_vol'] = compute_target(df, horizon)
     df = df.dropna()
-    features = df[['log_return', 'volatility', 'ma_5', 'ma_10', 'rsi']].values
+    features = df[FEATURE_COLUMNS].values
     target = df['target_vol'].values
+
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        df[FEATURE_COLUMNS + ['target_vol']].to_parquet(cache_path, engine='pyarrow', index=False)
+        evict_feature_cache(cache_dir)
     return features, target
 
-def main(data_path='data/market_data.csv', model_save_path='model/saved_model', horizon=5):
+def make_dataset(X, y, batch_size=32, shuffle=False):
+    """
+    Build a tf.data pipeline over in-memory arrays.
+    Casting to float32 and caching happen once; batches are prefetched so
+    the input pipeline overlaps with training steps.
+    """
+    ds = tf.data.Dataset.from_tensor_slices((X.astype(np.float32), y.astype(np.float32))).cache()
+    if shuffle:
+        ds = ds.shuffle(len(X), reshuffle_each_iteration=True)
+    return ds.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+def export_tflite(model, output_path):
+    """
+    Write an FP16-weight TFLite copy of the trained model.
+    Halves the weight bytes for edge/mobile consumers; the API keeps serving
+    through ONNX Runtime.
+    """
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_types = [tf.float16]
+    with open(output_path, 'wb') as f:
+        f.write(converter.convert())
+
+DEFAULT_DATA_PATH = 'data/GSPC.parquet'
+SNAPSHOT_DATA_PATH = 'data/market_data.csv'
+
+def export_saved_model(model, output_dir):
+    """
+    Export a SavedModel whose serving signature is specialized to a float32
+    (batch, features) input and XLA-compiled, so servers call one concrete
+    graph instead of going through Keras dispatch.
+    """
+    num_features = model.input_shape[-1]
+
+    @tf.function(input_signature=[tf.TensorSpec([None, num_features], tf.float32, name='features')], jit_compile=True)
+    def infer(x):
+        return model(x, training=False)
+
+    tf.saved_model.save(model, output_dir, signatures={'serving_default': infer.get_concrete_function()})
+
+def load_market_data(data_path=DEFAULT_DATA_PATH):
+    """
+    Load OHLCV data written by data/ingest.py (one Parquet file per symbol).
+    If the default ^GSPC file hasn't been downloaded, train on the CSV snapshot checked into the repo.
+    """
+    if data_path == DEFAULT_DATA_PATH and not os.path.exists(data_path) and os.path.exists(SNAPSHOT_DATA_PATH):
+        print(f"{data_path} not found, using {SNAPSHOT_DATA_PATH}")
+        data_path = SNAPSHOT_DATA_PATH
+    if data_path.endswith('.parquet'):
+        return pd.read_parquet(data_path, engine='pyarrow')
+    return pd.read_csv(data_path, index_col=0)
+
+def main(data_path=DEFAULT_DATA_PATH, model_save_path='model/saved_model', horizon=5):
     # Load data
-    df = pd.read_csv(data_path, index_col=0)
-    features, target = prepare_data(df, horizon)
+    df = load_market_data(data_path)
+    features, target = prepare_data(df, horizon, cache_dir=FEATURE_CACHE_DIR)
     # Scale features
     scaler = StandardScaler()
     features_scaled = scaler.fit_transform(features)
     # Train/test split
     X_train, X_test, y_train, y_test = train_test_split(features_scaled, target, test_size=0.2, random_state=42)
+    train_ds = make_dataset(X_train, y_train, shuffle=True)
+    val_ds = make_dataset(X_test, y_test)
+    # Let XLA fuse the dense/batch-norm/relu stack
+    tf.config.optimizer.set_jit(True)
     # Build model
     model = build_advanced_model(input_shape=(X_train.shape[1],))
     # Train
-    model.fit(X_train, y_train, epochs=30, batch_size=32, validation_data=(X_test, y_test))
+    model.fit(train_ds, epochs=30, validation_data=val_ds)
     # Save model and scaler
     os.makedirs(model_save_path, exist_ok=True)
     model.save(os.path.join(model_save_path, 'volatility_model.keras'))
+    export_tflite(model, os.path.join(model_save_path, 'volatility_model.tflite'))
+    export_saved_model(model, os.path.join(model_save_path, 'serving'))
     # Save scaler
     import joblib
     joblib.dump(scaler, os.path.join(model_save_path, 'scaler.save'))
+    # Plain float32 constants so the API can scale without unpickling sklearn
+    np.save(os.path.join(model_save_path, 'mean.npy'), scaler.mean_.astype(np.float32))
+    np.save(os.path.join(model_save_path, 'scale_inv.npy'), (1.0 / scaler.scale_).astype(np.float32))
     print(f"Model and scaler saved to {model_save_path}")
 
 if __name__ == '__main__':
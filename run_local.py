@@ -6,41 +6,167 @@ Starts both API and Dashboard services locally
 
 import subprocess
 import sys
+import os
+import select
+import signal
+import socket
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
 import webbrowser
 from pathlib import Path
 
+# The API's port; the dashboard is pointed at the same address
+API_PORT = 5000
+API_URL = f'http://localhost:{API_PORT}'
+
+# One pooled session for all /health probes, so repeated checks reuse a connection
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=2, pool_maxsize=2)
+_session.mount('http://', _adapter)
+
+# Last successful /health probe per port, as (monotonic time, True)
+_port_status = {}
+PORT_STATUS_TTL = 1.0
+
 def check_port(port):
-    """Check if a port is available"""
+    """Check if a port is available, reusing a successful probe for up to PORT_STATUS_TTL seconds"""
+    cached = _port_status.get(port)
+    if cached and time.monotonic() - cached[0] < PORT_STATUS_TTL:
+        return cached[1]
     try:
-        response = requests.get(f'http://localhost:{port}/health', timeout=2)
-        return response.status_code == 200
+        response = _session.get(f'http://localhost:{port}/health', timeout=2)
+        healthy = response.status_code == 200
     except:
+        healthy = False
+    # Failures are not cached: a service that is still starting must be re-probed right away
+    if healthy:
+        _port_status[port] = (time.monotonic(), True)
+    return healthy
+
+def wait_for_api(process, port, timeout=30):
+    """
+    Wait until the API answers /health, returning False if it exits first.
+    On Linux a pidfd turns child exit into a select() event next to the socket
+    connect; elsewhere the process is polled between connect attempts. An open
+    port is confirmed with /health before returning, because Flask's reloader
+    binds the socket before the reloaded app has loaded the model.
+    """
+    pidfd = None
+    if hasattr(os, 'pidfd_open'):
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except OSError:
+            pidfd = None
+    watched = [pidfd] if pidfd is not None else []
+    
+    deadline = time.monotonic() + timeout
+    try:
+        while time.monotonic() < deadline:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.setblocking(False)
+                sock.connect_ex(('127.0.0.1', port))
+                exited, connected, _ = select.select(watched, [sock], [], 0.1)
+                if exited:
+                    return False
+                port_open = connected and sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+            if port_open and check_port(port):
+                return True
+            # Connection refused, or the app is still starting: retry shortly
+            if pidfd is None and process.poll() is not None:
+                return False
+            if watched:
+                if select.select(watched, [], [], 0.01)[0]:
+                    return False
+            else:
+                # select() with no descriptors raises on Windows
+                time.sleep(0.01)
         return False
+    finally:
+        if pidfd is not None:
+            os.close(pidfd)
+
+def _first_exited(processes):
+    """(name, returncode) of the first child that has exited, or None"""
+    for name, process in processes.items():
+        if process is not None and process.poll() is not None:
+            return name, process.returncode
+    return None
+
+def wait_for_child_exit(processes):
+    """
+    Block until one of the named child processes exits and return (name, returncode).
+    On POSIX this sleeps in select() on a pipe that signal.set_wakeup_fd writes to when
+    SIGCHLD arrives; the write happens in C, so no Python lock is ever taken inside a
+    signal handler. Windows has no SIGCHLD, so it checks once a second.
+    Exits are collected with Popen.poll(), which reaps only our own children and keeps
+    their return codes, unlike waitpid(-1) which could also take webbrowser's helpers.
+    """
+    if not hasattr(signal, 'SIGCHLD'):
+        while True:
+            exited = _first_exited(processes)
+            if exited:
+                return exited
+            time.sleep(1)
+    
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    os.set_blocking(write_fd, False)
+    # A Python-level handler must be installed for the wakeup fd to see SIGCHLD; it does nothing
+    previous_handler = signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    previous_wakeup_fd = signal.set_wakeup_fd(write_fd)
+    try:
+        while True:
+            # Poll after draining, so an exit that lands in between still leaves a byte to wake select()
+            exited = _first_exited(processes)
+            if exited:
+                return exited
+            select.select([read_fd], [], [])
+            try:
+                while os.read(read_fd, 512):
+                    pass
+            except BlockingIOError:
+                pass
+    finally:
+        signal.set_wakeup_fd(previous_wakeup_fd)
+        signal.signal(signal.SIGCHLD, previous_handler)
+        os.close(read_fd)
+        os.close(write_fd)
+
+def open_service_log(name):
+    """
+    Open logs/<name>.out for a child's stdout and stderr. The apps write their own
+    logs/<name>.log; this file catches everything else printed to the console.
+    """
+    os.makedirs('logs', exist_ok=True)
+    return open(os.path.join('logs', f'{name}.out'), 'ab', buffering=0)
 
 def start_api():
     """Start the API server"""
     print("🚀 Starting VolatiQ API server...")
     
     # Check if API is already running
-    if check_port(5000):
-        print("✅ API already running on http://localhost:5000")
+    if check_port(API_PORT):
+        print(f"✅ API already running on {API_URL}")
         return None
     
-    # Start API in background
-    api_process = subprocess.Popen([
-        sys.executable, 'api/app.py'
-    ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    # Start API in background; its console output goes to a file, since an undrained pipe
+    # would block the server once the buffer fills
+    with open_service_log('api') as log_file:
+        api_process = subprocess.Popen([
+            sys.executable, 'api/app.py'
+        ], stdout=log_file, stderr=subprocess.STDOUT, start_new_session=True,
+          env={**os.environ, 'API_PORT': str(API_PORT)})
     
-    # Wait for API to start
-    for i in range(10):
-        time.sleep(1)
-        if check_port(5000):
-            print("✅ API started successfully on http://localhost:5000")
-            return api_process
-        print(f"⏳ Waiting for API to start... ({i+1}/10)")
+    # Wait for /health to answer (or the process to die)
+    print("⏳ Waiting for API to start...")
+    if wait_for_api(api_process, API_PORT):
+        print(f"✅ API started successfully on {API_URL}")
+        return api_process
     
+    # The child runs in its own session, so it would not see the user's Ctrl+C later
+    api_process.terminate()
     print("❌ API failed to start")
     return None
 
@@ -48,9 +174,11 @@ def start_dashboard():
     """Start the dashboard"""
     print("📊 Starting VolatiQ Dashboard...")
     
-    dashboard_process = subprocess.Popen([
-        sys.executable, 'dashboard/app.py'
-    ])
+    with open_service_log('dashboard') as log_file:
+        dashboard_process = subprocess.Popen([
+            sys.executable, 'dashboard/app.py'
+        ], stdout=log_file, stderr=subprocess.STDOUT, start_new_session=True,
+          env={**os.environ, 'API_URL': API_URL})
     
     # Wait a moment for dashboard to start
     time.sleep(3)
@@ -64,7 +192,7 @@ def open_browser():
     print("🌐 Opening browser...")
     
     try:
-        webbrowser.open('http://localhost:5000')
+        webbrowser.open(API_URL)
         time.sleep(1)
         webbrowser.open('http://localhost:8050')
         print("✅ Browser tabs opened")
@@ -83,25 +211,25 @@ def main():
     
     # Start API
     api_process = start_api()
-    if not api_process and not check_port(5000):
+    if not api_process and not check_port(API_PORT):
         print("❌ Failed to start API. Exiting.")
         sys.exit(1)
     
     # Start Dashboard
     dashboard_process = start_dashboard()
     
-    # Open browser
-    open_browser()
+    # Open browser off the main thread, so its delays don't hold up the banner or Ctrl+C
+    threading.Thread(target=open_browser, daemon=True).start()
     
     print("\n" + "=" * 40)
     print("🎉 VolatiQ is running locally!")
     print("=" * 40)
     print("📋 Services:")
-    print("  • API:       http://localhost:5000")
+    print(f"  • API:       {API_URL}")
     print("  • Dashboard: http://localhost:8050")
     print("\n🧪 Test endpoints:")
-    print("  • Health:    curl http://localhost:5000/health")
-    print("  • API Info:  curl http://localhost:5000/")
+    print(f"  • Health:    curl {API_URL}/health")
+    print(f"  • API Info:  curl {API_URL}/")
     print("\n📱 Next steps:")
     print("  1. Visit the dashboard at http://localhost:8050")
     print("  2. Upload a CSV file with financial features")
@@ -110,21 +238,21 @@ def main():
     print("\n🛑 Press Ctrl+C to stop all services")
     
     try:
-        # Keep the script running
-        while True:
-            time.sleep(1)
+        # Keep the script running until Ctrl+C or until a service dies
+        name, returncode = wait_for_child_exit({'API': api_process, 'Dashboard': dashboard_process})
+        print(f"\n❌ {name} exited unexpectedly (code {returncode}), stopping VolatiQ services...")
     except KeyboardInterrupt:
         print("\n🛑 Stopping VolatiQ services...")
-        
-        if api_process:
-            api_process.terminate()
-            print("✅ API stopped")
-        
-        if dashboard_process:
-            dashboard_process.terminate()
-            print("✅ Dashboard stopped")
-        
-        print("👋 VolatiQ services stopped. Goodbye!")
+    
+    if api_process:
+        api_process.terminate()
+        print("✅ API stopped")
+    
+    if dashboard_process:
+        dashboard_process.terminate()
+        print("✅ Dashboard stopped")
+    
+    print("👋 VolatiQ services stopped. Goodbye!")
 
 if __name__ == "__main__":
     main()
@@ -4,13 +4,18 @@ VolatiQ Setup Validation Script
 Validates that the environment is properly configured and ready for deployment
 """
 
+import argparse
+import asyncio
+import hashlib
+import io
+import json
 import sys
 import os
+import sysconfig
 import subprocess
-import importlib
+import importlib.util
 import requests
 import threading
-import time
 from pathlib import Path
 
 # Add project root to path
@@ -28,57 +33,116 @@ def check_python_version():
         print(f"❌ Python {version.major}.{version.minor}.{version.micro} is not compatible. Need Python 3.11+")
         return False
 
+# Records the environment that last passed check_dependencies, so unchanged setups skip the imports
+DEPS_CACHE_PATH = project_root / ".volatiq_validate_cache.json"
+
+def dependencies_key():
+    """Fingerprint requirements.txt, the interpreter and the installed package set"""
+    digest = hashlib.sha256((project_root / "requirements.txt").read_bytes())
+    digest.update(sys.executable.encode())
+    digest.update(sys.version.encode())
+    # Installing or removing a package changes the site-packages directory's mtime
+    digest.update(str(os.stat(sysconfig.get_path('purelib')).st_mtime_ns).encode())
+    return digest.hexdigest()
+
+# Distribution names for packages whose import name differs, for the pip hint
+PIP_NAMES = {
+    'flask_limiter': 'flask-limiter',
+    'dash_bootstrap_components': 'dash-bootstrap-components',
+    'sklearn': 'scikit-learn',
+    'dotenv': 'python-dotenv',
+    'psycopg2': 'psycopg2-binary',
+}
+
+def is_installed(package):
+    """
+    True if the package can be found on the import path. Only the module spec is
+    looked up, so checking TensorFlow or SHAP does not load them.
+    """
+    try:
+        return importlib.util.find_spec(package) is not None
+    except (ImportError, ValueError):
+        return False
+
 def check_dependencies():
     """Check if all required packages are installed"""
     print("\n📦 Checking dependencies...")
     
+    try:
+        deps_key = dependencies_key()
+    except OSError:
+        deps_key = None
+    try:
+        cached_key = json.loads(DEPS_CACHE_PATH.read_text()).get('deps_key')
+    except (OSError, ValueError):
+        cached_key = None
+    if deps_key is not None and cached_key == deps_key:
+        print("✅ All dependencies are installed (cached, environment unchanged)")
+        return True
+    
     required_packages = [
         'flask', 'flask_limiter', 'tensorflow', 'dash', 'pandas', 
         'numpy', 'joblib', 'shap', 'requests', 'dash_bootstrap_components',
         'sklearn', 'yfinance', 'dotenv', 'redis', 'psycopg2',
-        'gunicorn', 'pytest'
+        'gunicorn', 'pytest', 'onnxruntime', 'tf2onnx', 'orjson', 'pyarrow',
+        'numba'
     ]
     
     missing_packages = []
     
     for package in required_packages:
-        try:
-            importlib.import_module(package)
+        if is_installed(package):
             print(f"✅ {package}")
-        except ImportError:
+        else:
             print(f"❌ {package} - Not found")
             missing_packages.append(package)
     
     if missing_packages:
-        print(f"\n❌ Missing packages: {', '.join(missing_packages)}")
+        print(f"\n❌ Missing packages: {', '.join(PIP_NAMES.get(package, package) for package in missing_packages)}")
         print("Run: pip install -r requirements.txt")
         return False
     
+    if deps_key is not None:
+        try:
+            DEPS_CACHE_PATH.write_text(json.dumps({'deps_key': deps_key}))
+        except OSError:
+            pass
+    
     print("✅ All dependencies are installed")
     return True
 
+def file_size(path):
+    """Size of a file in bytes from a single stat call, or None if it does not exist"""
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return None
+
 def check_model_files():
-    """Check if model files exist"""
+    """Check if model files exist and are not truncated"""
     print("\n🤖 Checking model files...")
     
-    model_path = project_root / "model" / "saved_model" / "volatility_model.keras"
-    scaler_path = project_root / "model" / "saved_model" / "scaler.save"
-    
-    if model_path.exists():
-        print(f"✅ Model file found: {model_path}")
-        model_ok = True
-    else:
-        print(f"❌ Model file missing: {model_path}")
-        model_ok = False
+    saved_model_dir = project_root / "model" / "saved_model"
+    # (label, path, smallest plausible size): a real .keras archive is well over 1KB,
+    # while the pickled scaler is a few hundred bytes
+    model_files = [
+        ("Model", saved_model_dir / "volatility_model.keras", 1024),
+        ("Scaler", saved_model_dir / "scaler.save", 1),
+    ]
     
-    if scaler_path.exists():
-        print(f"✅ Scaler file found: {scaler_path}")
-        scaler_ok = True
-    else:
-        print(f"❌ Scaler file missing: {scaler_path}")
-        scaler_ok = False
+    all_ok = True
+    for label, path, min_size in model_files:
+        size = file_size(path)
+        if size is None:
+            print(f"❌ {label} file missing: {path}")
+            all_ok = False
+        elif size < min_size:
+            print(f"❌ {label} file looks truncated ({size} bytes): {path}")
+            all_ok = False
+        else:
+            print(f"✅ {label} file found: {path} ({size} bytes)")
     
-    if not (model_ok and scaler_ok):
+    if not all_ok:
         print("Run: python model/train.py")
         return False
     
@@ -100,34 +164,70 @@ def check_directories():
     
     return True
 
+# In-process test client shared by the API checks, so the model is loaded and warmed once
+_client = None
+# Set by --integration: exercise the API over real HTTP instead, through this server
+_integration = False
+_http_server = None
+# Shared by the --integration checks so they reuse one connection to the server
+_http_session = requests.Session()
+
+def get_client():
+    """Return the shared Flask test client, importing the API on first use"""
+    global _client
+    if _client is None:
+        from api.app import app
+        _client = app.test_client()
+    return _client
+
+def get_http_server(port=5003):
+    """
+    Serve the API from a background thread for full HTTP-stack validation.
+    make_server returns once the socket is listening, so requests can be sent
+    as soon as this does, with no startup sleep.
+    """
+    global _http_server
+    if _http_server is None:
+        from werkzeug.serving import make_server
+        from api.app import app
+        _http_server = make_server('127.0.0.1', port, app, threaded=True)
+        threading.Thread(target=_http_server.serve_forever, daemon=True).start()
+    return _http_server
+
+def stop_http_server():
+    """Shut down the --integration server, if one was started"""
+    global _http_server
+    if _http_server is not None:
+        _http_server.shutdown()
+        _http_server.server_close()
+        _http_server = None
+
+def api_request(method, path, **kwargs):
+    """Issue a request against the API and return (status_code, json body)"""
+    if _integration:
+        server = get_http_server()
+        url = f'http://127.0.0.1:{server.server_port}{path}'
+        response = _http_session.request(method, url, timeout=10, **kwargs)
+        return response.status_code, response.json()
+    response = get_client().open(path, method=method, **kwargs)
+    return response.status_code, response.get_json()
+
 def test_api_startup():
     """Test that the API can start and respond"""
     print("\n🌐 Testing API startup...")
     
     try:
-        # Import and start API
-        from api.app import app
-        
-        def start_server():
-            app.run(host='127.0.0.1', port=5003, debug=False, use_reloader=False)
-        
-        # Start server in background
-        server_thread = threading.Thread(target=start_server, daemon=True)
-        server_thread.start()
-        time.sleep(3)
-        
         # Test health endpoint
-        response = requests.get('http://127.0.0.1:5003/health', timeout=5)
+        status_code, health_data = api_request('GET', '/health')
         
-        if response.status_code == 200:
-            health_data = response.json()
+        if status_code == 200:
             print(f"✅ API health check passed")
             print(f"   Status: {health_data['status']}")
             print(f"   Model loaded: {health_data['model_loaded']}")
             print(f"   Prediction working: {health_data['prediction_working']}")
             return True
         else:
-            print(f"❌ API health check failed: {response.status_code}")
+            print(f"❌ API health check failed: {status_code}")
             return False
             
     except Exception as e:
@@ -151,35 +251,20 @@ def test_prediction():
     print("\n🔮 Testing prediction...")
     
     try:
-        from api.app import app
-        
-        def start_server():
-            app.run(host='127.0.0.1', port=5004, debug=False, use_reloader=False)
-        
-        # Start server in background
-        server_thread = threading.Thread(target=start_server, daemon=True)
-        server_thread.start()
-        time.sleep(3)
-        
         # Test prediction
         test_data = {
             'features': [[0.001, 0.02, 150.5, 149.8, 65.2]]
         }
         
-        response = requests.post(
-            'http://127.0.0.1:5004/predict',
-            json=test_data,
-            timeout=10
-        )
+        status_code, result = api_request('POST', '/predict', json=test_data)
         
-        if response.status_code == 200:
-            result = response.json()
+        if status_code == 200:
             print(f"✅ Prediction successful")
             print(f"   Prediction: {result['predictions'][0]:.6f}")
             print(f"   Processing time: {result['processing_time_seconds']:.3f}s")
             return True
         else:
-            print(f"❌ Prediction failed: {response.status_code}")
+            print(f"❌ Prediction failed: {status_code}")
             return False
             
     except Exception as e:
@@ -218,31 +303,98 @@ def check_environment_config():
         print(f"❌ Environment config error: {e}")
         return False
 
-def main():
-    """Run all validation checks"""
-    print("🚀 VolatiQ Setup Validation")
-    print("=" * 50)
+class _CheckOutput(threading.local):
+    """Per-thread buffer for the output of the check running on that thread"""
+    buffer = None
+
+_check_output = _CheckOutput()
+
+class _ThreadRoutedStdout:
+    """sys.stdout stand-in that sends prints from a running check to that check's buffer"""
     
-    checks = [
-        ("Python Version", check_python_version),
-        ("Dependencies", check_dependencies),
-        ("Model Files", check_model_files),
-        ("Directories", check_directories),
-        ("Environment Config", check_environment_config),
-        ("API Startup", test_api_startup),
-        ("Dashboard Import", test_dashboard_import),
-        ("Prediction Test", test_prediction),
-    ]
+    def __init__(self, stream):
+        self._stream = stream
     
-    results = []
+    def write(self, text):
+        buffer = _check_output.buffer
+        return (buffer if buffer is not None else self._stream).write(text)
     
-    for check_name, check_func in checks:
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+def _run_check(check_name, check_func):
+    """Run one check on the current thread and return (result, captured output)"""
+    _check_output.buffer = io.StringIO()
+    try:
         try:
             result = check_func()
-            results.append((check_name, result))
         except Exception as e:
             print(f"❌ {check_name} check failed with exception: {e}")
-            results.append((check_name, False))
+            result = False
+        return result, _check_output.buffer.getvalue()
+    finally:
+        _check_output.buffer = None
+
+async def run_checks(phases):
+    """
+    Run each phase's check groups concurrently on worker threads, one phase after another.
+    Returns {check name: (result, output)}.
+    """
+    outcomes = {}
+    
+    async def run_group(group):
+        for check_name, check_func in group:
+            outcomes[check_name] = await asyncio.to_thread(_run_check, check_name, check_func)
+    
+    for phase in phases:
+        await asyncio.gather(*(run_group(group) for group in phase))
+    return outcomes
+
+def main(integration=False):
+    """Run all validation checks"""
+    print("🚀 VolatiQ Setup Validation")
+    print("=" * 50)
+    
+    global _integration
+    _integration = integration
+    if integration:
+        print("🔌 Integration mode: testing the API over HTTP")
+    
+    # Checks in one inner list run in order; the lists themselves run concurrently.
+    # Environment checks go first because the API import needs logs/ to exist.
+    environment_checks = [
+        [("Python Version", check_python_version)],
+        [("Dependencies", check_dependencies)],
+        [("Model Files", check_model_files)],
+        [("Directories", check_directories)],
+        [("Environment Config", check_environment_config)],
+    ]
+    # Both use the same API client or server
+    api_checks = [
+        [("API Startup", test_api_startup), ("Prediction Test", test_prediction)],
+    ]
+    # Not concurrent with the API import: each app sets up root logging with basicConfig,
+    # and whichever runs first wins, so the API must configure its log files first
+    dashboard_checks = [
+        [("Dashboard Import", test_dashboard_import)],
+    ]
+    
+    real_stdout = sys.stdout
+    sys.stdout = _ThreadRoutedStdout(real_stdout)
+    try:
+        outcomes = asyncio.run(run_checks([environment_checks, api_checks, dashboard_checks]))
+    finally:
+        sys.stdout = real_stdout
+        stop_http_server()
+    
+    # Replay each check's output in the usual order, so concurrent checks don't interleave
+    order = ["Python Version", "Dependencies", "Model Files", "Directories", "Environment Config",
+             "API Startup", "Dashboard Import", "Prediction Test"]
+    results = []
+    for check_name in order:
+        result, output = outcomes[check_name]
+        print(output, end="")
+        results.append((check_name, result))
     
     # Summary
     print("\n" + "=" * 50)
@@ -274,5 +426,9 @@ def main():
         return False
 
 if __name__ == "__main__":
-    success = main()
+    parser = argparse.ArgumentParser(description="Validate the VolatiQ setup")
+    parser.add_argument('--integration', action='store_true',
+                        help="run the API checks against a real HTTP server instead of the Flask test client")
+    args = parser.parse_args()
+    success = main(integration=args.integration)
     sys.exit(0 if success else 1)
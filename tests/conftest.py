@@ -0,0 +1,29 @@
+"""
+Shared pytest fixtures for the VolatiQ test suite
+"""
+import pytest
+
+
+@pytest.fixture(scope="session")
+def shared_client():
+    """
+    Create one test client for the whole session. api.app loads and warms the
+    model on import; the first /health request also primes the health cache,
+    so no test pays for initialization.
+    """
+    from api.app import app
+    app.config['TESTING'] = True
+    app.config['SECRET_KEY'] = 'test-secret-key'
+    with app.test_client() as client:
+        client.get('/health')
+        yield client
+
+
+@pytest.fixture
+def client(shared_client):
+    """The shared test client, with any app.config changes undone after each test"""
+    config = shared_client.application.config
+    saved_config = dict(config)
+    yield shared_client
+    config.clear()
+    config.update(saved_config)
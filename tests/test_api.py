@@ -3,17 +3,15 @@ Test suite for VolatiQ API endpoints
 """
 import pytest
 import json
+import threading
+import time
 import numpy as np
-from api.app import app, config
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 
-
-@pytest.fixture
-def client():
-    """Create test client"""
-    app.config['TESTING'] = True
-    app.config['SECRET_KEY'] = 'test-secret-key'
-    with app.test_client() as client:
-        yield client
+# Over-limit request bodies, serialized once instead of json.dumps-ing ~1000 rows per test run
+_SAMPLE_ROW = b'[0.001,0.02,150.5,149.8,65.2]'
+_OVERSIZE_PREDICT_BYTES = b'{"features":[' + b','.join([_SAMPLE_ROW] * 1001) + b']}'
+_OVERSIZE_EXPLAIN_BYTES = b'{"features":[' + b','.join([_SAMPLE_ROW] * 11) + b']}'
 
 
 class TestAPIEndpoints:
@@ -24,30 +22,41 @@ class TestAPIEndpoints:
         response = client.get('/')
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'message' in data
         assert 'version' in data
         assert 'endpoints' in data
         assert data['version'] == '1.0.0'
     
-    def test_health_check(self, client):
+    def test_health_check(self, client, monkeypatch):
         """Test health check endpoint"""
+        import api.app as api_app
+        monkeypatch.setattr(api_app, '_health_cache', (0.0, None))
+        
         response = client.get('/health')
         
         # Should return 200 or 503 depending on model availability
         assert response.status_code in [200, 503]
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'status' in data
         assert 'timestamp' in data
         assert data['status'] in ['healthy', 'unhealthy']
+        
+        # The check runs once, then is served from the TTL cache
+        assert response.headers['X-Cache'] == 'MISS'
+        cached = client.get('/health')
+        assert cached.headers['X-Cache'] == 'HIT'
+        assert cached.status_code == response.status_code
+        assert 'max-age=' in cached.headers['Cache-Control']
     
     def test_metrics_endpoint(self, client):
         """Test metrics endpoint"""
         response = client.get('/metrics')
         assert response.status_code == 200
+        assert response.headers['Cache-Control'] == 'public, max-age=10'
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'model_info' in data
         assert 'system_info' in data
         assert 'timestamp' in data
@@ -74,59 +83,80 @@ class TestAPIEndpoints:
         
         # Should work if model is loaded, otherwise return 500
         assert response.status_code in [200, 500]
+        # Predictions are never cacheable
+        assert response.headers['Cache-Control'] == 'no-store'
         
         if response.status_code == 200:
-            data = json.loads(response.data)
+            data = response.get_json()
             assert 'predictions' in data
             assert 'timestamp' in data
             assert 'model_version' in data
             assert len(data['predictions']) == 2
     
-    def test_predict_invalid_input(self, client):
-        """Test prediction with invalid input"""
+    @pytest.mark.parametrize('payload, expected_error', [
         # Missing features
-        response = client.post('/predict',
-                              data=json.dumps({}),
-                              content_type='application/json')
-        assert response.status_code == 400
-        
-        # Wrong feature count
-        invalid_features = {
-            "features": [
-                [0.001, 0.02, 150.5]  # Only 3 features instead of 5
-            ]
-        }
-        response = client.post('/predict',
-                              data=json.dumps(invalid_features),
-                              content_type='application/json')
-        assert response.status_code == 400
-        
+        ({}, 'missing features'),
+        # Wrong feature count: only 3 features instead of 5
+        ({"features": [[0.001, 0.02, 150.5]]}, 'expected 5 features'),
         # NaN values
-        nan_features = {
-            "features": [
-                [0.001, float('nan'), 150.5, 149.8, 65.2]
-            ]
-        }
+        ({"features": [[0.001, float('nan'), 150.5, 149.8, 65.2]]}, 'nan or infinite'),
+    ], ids=['missing', 'feature-count', 'nan'])
+    def test_predict_invalid_input(self, client, payload, expected_error):
+        """Test prediction with invalid input"""
         response = client.post('/predict',
-                              data=json.dumps(nan_features),
+                              data=json.dumps(payload),
                               content_type='application/json')
         assert response.status_code == 400
+        
+        data = response.get_json()
+        assert expected_error in data['error'].lower()
     
     def test_predict_batch_size_limit(self, client):
         """Test prediction batch size limits"""
-        # Create a large batch (over limit)
-        large_batch = {
-            "features": [[0.001, 0.02, 150.5, 149.8, 65.2]] * 1001
-        }
-        
+        # Large batch (over limit)
         response = client.post('/predict',
-                              data=json.dumps(large_batch),
+                              data=_OVERSIZE_PREDICT_BYTES,
                               content_type='application/json')
         assert response.status_code == 400
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'batch size exceeds maximum' in data['error'].lower()
     
+    def test_predict_bin_valid_input(self, client):
+        """Test binary prediction with a raw float32 feature matrix"""
+        features = np.array([
+            [0.001, 0.02, 150.5, 149.8, 65.2],
+            [0.002, 0.018, 151.0, 150.1, 68.5]
+        ], dtype=np.float32)
+        
+        response = client.post('/predict_bin',
+                              data=features.tobytes(),
+                              content_type='application/octet-stream',
+                              headers={'X-Shape': '2,5'})
+        
+        # Should work if model is loaded, otherwise return 500
+        assert response.status_code in [200, 500]
+        
+        if response.status_code == 200:
+            preds = np.frombuffer(response.data, dtype=np.float32)
+            assert preds.shape == (2,)
+            assert response.headers['X-Shape'] == '2'
+    
+    def test_predict_bin_invalid_input(self, client):
+        """Test binary prediction with a body that doesn't match X-Shape"""
+        features = np.zeros((2, 5), dtype=np.float32)
+        
+        response = client.post('/predict_bin',
+                              data=features.tobytes(),
+                              content_type='application/octet-stream',
+                              headers={'X-Shape': '3,5'})
+        assert response.status_code == 400
+        
+        response = client.post('/predict_bin',
+                              data=features.tobytes(),
+                              content_type='application/octet-stream')
+        assert response.status_code == 400
+    
     def test_explain_valid_input(self, client):
         """Test explanation with valid input"""
         valid_features = {
@@ -143,25 +173,57 @@ class TestAPIEndpoints:
         assert response.status_code in [200, 500]
         
         if response.status_code == 200:
-            data = json.loads(response.data)
+            data = response.get_json()
             assert 'predictions' in data
             assert 'shap_values' in data
             assert 'feature_names' in data
             assert len(data['feature_names']) == 5
     
-    def test_explain_batch_limit(self, client):
-        """Test explanation batch size limits"""
-        # Create batch over limit for explanations
-        large_batch = {
-            "features": [[0.001, 0.02, 150.5, 149.8, 65.2]] * 11
+    def test_explain_kernel_method(self, client):
+        """Test explanation with the KernelSHAP fallback"""
+        valid_features = {
+            "features": [
+                [0.001, 0.02, 150.5, 149.8, 65.2]
+            ]
+        }
+        
+        response = client.post('/explain?method=kernel',
+                              data=json.dumps(valid_features),
+                              content_type='application/json')
+        
+        # Should work if model is loaded, otherwise return 500
+        assert response.status_code in [200, 500]
+        
+        if response.status_code == 200:
+            data = response.get_json()
+            assert data['method'] == 'kernel'
+            assert len(data['shap_values']) == 1
+    
+    def test_explain_invalid_method(self, client):
+        """Test explanation with an unknown method"""
+        valid_features = {
+            "features": [
+                [0.001, 0.02, 150.5, 149.8, 65.2]
+            ]
         }
         
+        response = client.post('/explain?method=lime',
+                              data=json.dumps(valid_features),
+                              content_type='application/json')
+        assert response.status_code == 400
+        
+        data = response.get_json()
+        assert 'unknown explanation method' in data['error'].lower()
+    
+    def test_explain_batch_limit(self, client):
+        """Test explanation batch size limits"""
+        # Batch over limit for explanations
         response = client.post('/explain',
-                              data=json.dumps(large_batch),
+                              data=_OVERSIZE_EXPLAIN_BYTES,
                               content_type='application/json')
         assert response.status_code == 400
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'maximum 10 samples' in data['error'].lower()
     
     def test_404_endpoint(self, client):
@@ -169,7 +231,7 @@ class TestAPIEndpoints:
         response = client.get('/nonexistent')
         assert response.status_code == 404
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
     
     def test_method_not_allowed(self, client):
@@ -191,6 +253,7 @@ class TestInputValidation:
         assert is_valid is True
         assert error_msg == ''
         assert features.shape == (1, 5)
+        assert features.dtype == np.float32
         
         # Missing features
         is_valid, error_msg, features = validate_features_input({})
@@ -208,6 +271,155 @@ class TestInputValidation:
         is_valid, error_msg, features = validate_features_input(wrong_count)
         assert is_valid is False
         assert 'expected 5 features' in error_msg.lower()
+        
+        # Non-finite values, checked after the shape
+        for bad_value in (float('nan'), float('inf'), -float('inf')):
+            non_finite = {"features": [[0.001, 0.02, 150.5, 149.8, 65.2], [0.001, bad_value, 150.5, 149.8, 65.2]]}
+            is_valid, error_msg, features = validate_features_input(non_finite)
+            assert is_valid is False
+            assert 'nan or infinite' in error_msg.lower()
+        
+        # Ragged rows fail while parsing
+        ragged = {"features": [[0.001, 0.02, 150.5, 149.8, 65.2], [0.001, 0.02]]}
+        is_valid, error_msg, features = validate_features_input(ragged)
+        assert is_valid is False
+        assert 'invalid features format' in error_msg.lower()
+
+
+class TestExactKernelExplainer:
+    """Test the precomputed-coalition kernel explainer"""
+    
+    def test_linear_model_attributions(self):
+        """Shapley values of a linear model are weight * (x - background)"""
+        from api.explain import ExactKernelExplainer
+        
+        weights = np.array([1.0, -2.0, 0.5, 3.0, 0.0], dtype=np.float32)
+        background = np.array([[0.1, 0.2, 0.3, 0.4, 0.5]], dtype=np.float32)
+        explainer = ExactKernelExplainer(lambda x: (x @ weights)[:, None], background)
+        
+        X = np.array([[1.0, 2.0, 3.0, 4.0, 5.0], [0.0, 0.0, 0.0, 0.0, 0.0]], dtype=np.float32)
+        shap_values = explainer.shap_values(X)
+        
+        assert shap_values.shape == (2, 5, 1)
+        np.testing.assert_allclose(shap_values[..., 0], weights * (X - background), atol=1e-5)
+    
+    def test_wide_inputs_use_sampled_kernel_shap(self):
+        """Feature sets too wide to enumerate fall back to sampled KernelSHAP"""
+        from api.explain import EXACT_MAX_FEATURES, SampledKernelExplainer, make_kernel_explainer
+        
+        num_features = EXACT_MAX_FEATURES + 2
+        weights = np.linspace(-1.0, 1.0, num_features).astype(np.float32)
+        background = np.full((1, num_features), 0.5, dtype=np.float32)
+        explainer = make_kernel_explainer(lambda x: (x @ weights)[:, None], background)
+        assert isinstance(explainer, SampledKernelExplainer)
+        
+        X = np.linspace(0.0, 1.0, 2 * num_features, dtype=np.float32).reshape(2, num_features)
+        shap_values = explainer.shap_values(X)
+        
+        assert shap_values.shape == (2, num_features, 1)
+        np.testing.assert_allclose(shap_values[..., 0], weights * (X - background), atol=1e-4)
+
+
+class TestDynamicBatcher:
+    """Test coalescing of concurrent inference requests"""
+    
+    @staticmethod
+    def gated_model(calls, gate, entered, error=None):
+        """
+        Model stub that records each batch and returns 10 * the first column.
+        The first call signals `entered` and blocks on `gate`, so the test can
+        queue more requests while the model is busy.
+        """
+        def infer(x):
+            calls.append(x.copy())
+            if len(calls) == 1:
+                entered.set()
+                gate.wait(10)
+            if error is not None:
+                raise error
+            return x[:, :1] * 10
+        return infer
+    
+    def test_requests_queued_while_busy_share_one_model_call(self):
+        """Requests that arrive during a model call run together and each caller gets its own rows"""
+        from api.batching import DynamicBatcher
+        
+        calls, gate, entered = [], threading.Event(), threading.Event()
+        batcher = DynamicBatcher(self.gated_model(calls, gate, entered))
+        first = batcher.submit(np.zeros((1, 5), dtype=np.float32))
+        assert entered.wait(10)
+        
+        blocks = [np.full((rows, 5), i + 1, dtype=np.float32) for i, rows in enumerate([1, 2, 3])]
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(batcher.predict, block, 10) for block in blocks]
+            # Wait until all three are queued behind the busy model, then let it finish
+            deadline = time.monotonic() + 10
+            while batcher._queue.qsize() < 3 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            gate.set()
+            results = [future.result() for future in futures]
+        first.result(timeout=10)
+        
+        assert [call.shape[0] for call in calls] == [1, 6]
+        for block, result in zip(blocks, results):
+            np.testing.assert_array_equal(result, block[:, :1] * 10)
+    
+    def test_model_error_reaches_every_caller(self):
+        """An exception from the model is raised in every request of the batch"""
+        from api.batching import DynamicBatcher
+        
+        calls, gate, entered = [], threading.Event(), threading.Event()
+        batcher = DynamicBatcher(self.gated_model(calls, gate, entered, error=ValueError('model exploded')))
+        futures = [batcher.submit(np.zeros((1, 5), dtype=np.float32))]
+        assert entered.wait(10)
+        futures += [batcher.submit(np.zeros((1, 5), dtype=np.float32)) for _ in range(3)]
+        gate.set()
+        
+        for future in futures:
+            with pytest.raises(ValueError, match='model exploded'):
+                future.result(timeout=10)
+        assert [call.shape[0] for call in calls] == [1, 3]
+    
+    def test_batches_are_capped_at_max_batch_requests(self):
+        """A backlog is split into batches of at most max_batch_requests"""
+        from api.batching import DynamicBatcher
+        
+        calls, gate, entered = [], threading.Event(), threading.Event()
+        batcher = DynamicBatcher(self.gated_model(calls, gate, entered), max_batch_requests=2)
+        futures = [batcher.submit(np.full((1, 5), 0, dtype=np.float32))]
+        assert entered.wait(10)
+        futures += [batcher.submit(np.full((1, 5), i, dtype=np.float32)) for i in range(1, 6)]
+        gate.set()
+        results = [future.result(timeout=10) for future in futures]
+        
+        assert [call.shape[0] for call in calls] == [1, 2, 2, 1]
+        assert [float(result[0, 0]) for result in results] == [0.0, 10.0, 20.0, 30.0, 40.0, 50.0]
+    
+    def test_lone_request_does_not_wait(self):
+        """With nothing else pending, a request runs immediately instead of waiting for company"""
+        from api.batching import DynamicBatcher
+        
+        batcher = DynamicBatcher(lambda x: x[:, :1])
+        features = np.zeros((1, 5), dtype=np.float32)
+        batcher.predict(features, timeout=10)
+        
+        start = time.monotonic()
+        for _ in range(20):
+            batcher.predict(features, timeout=10)
+        # A thread hand-off is tens of microseconds; the old 5 ms wait would take 100 ms here
+        assert (time.monotonic() - start) / 20 < 0.002
+    
+    def test_predict_timeout(self):
+        """predict gives up after its timeout while the model is still running"""
+        from api.batching import DynamicBatcher
+        
+        def slow_model(x):
+            time.sleep(0.5)
+            return x[:, :1]
+        
+        batcher = DynamicBatcher(slow_model)
+        with pytest.raises(FuturesTimeoutError):
+            batcher.predict(np.zeros((1, 5), dtype=np.float32), timeout=0.05)
 
 
 class TestConfiguration:
@@ -226,6 +438,16 @@ class TestConfiguration:
         assert len(errors) > 0
         assert any('SECRET_KEY must be changed' in error for error in errors)
     
+    def test_config_model_precision(self):
+        """Test model precision validation"""
+        from config import Config
+        
+        test_config = Config()
+        test_config.MODEL_PRECISION = 'int4'
+        
+        errors = test_config.validate()
+        assert any('MODEL_PRECISION' in error for error in errors)
+    
     def test_config_properties(self):
         """Test configuration properties"""
         from config import Config
@@ -0,0 +1,85 @@
+"""
+Test suite for VolatiQ feature engineering
+"""
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Import the training modules the way model/train.py does (model.py, not the model package),
+# which also keeps numba's on-disk cache keyed on the same module name
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'model'))
+from _features_numba import compute_all_features
+
+
+def make_close(n=200, seed=0):
+    """Random-walk close prices"""
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+
+
+class TestFeatureKernels:
+    """Test Numba feature kernels against the pandas definitions"""
+
+    def test_fused_features_match_pandas_rolling(self):
+        """Fused kernel reproduces the pandas rolling feature definitions"""
+        horizon = 5
+        # compute_features passes float32 prices; the reference sees the same values in float64
+        close32 = make_close().astype(np.float32)
+        close = pd.Series(close32.astype(np.float64))
+        log_return = np.log(close / close.shift(1))
+        delta = close.diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        expected = {
+            'log_return': log_return,
+            'volatility': log_return.rolling(window=horizon).std(),
+            'ma_5': close.rolling(window=5).mean(),
+            'ma_10': close.rolling(window=10).mean(),
+            'rsi': 100 - (100 / (1 + gain / (loss + 1e-9))),
+        }
+
+        features = compute_all_features(close32, horizon)
+        for name, actual in zip(expected, features):
+            # log_return is stored as float32
+            rtol = 1e-6 if name == 'log_return' else 1e-9
+            np.testing.assert_allclose(actual, expected[name].to_numpy(), rtol=rtol, err_msg=name)
+
+
+class TestFeatureCache:
+    """Test memoization of the training feature pipeline"""
+
+    def test_prepare_data_reads_cached_features(self, tmp_path, monkeypatch):
+        """Second call with the same Close series is served from the Parquet cache"""
+        import train
+
+        df = pd.DataFrame({'Close': make_close()})
+        features, target = train.prepare_data(df, cache_dir=str(tmp_path))
+        assert len(list(tmp_path.glob('*.parquet'))) == 1
+
+        def fail(*args, **kwargs):
+            raise AssertionError('features recomputed on a cache hit')
+        monkeypatch.setattr(train, 'compute_features', fail)
+        cached_features, cached_target = train.prepare_data(df, cache_dir=str(tmp_path))
+
+        np.testing.assert_array_equal(cached_features, features)
+        np.testing.assert_array_equal(cached_target, target)
+
+    def test_feature_version_bump_invalidates_cache(self, tmp_path, monkeypatch):
+        """Features cached by an older FEATURE_VERSION are recomputed, not reused"""
+        import train
+
+        df = pd.DataFrame({'Close': make_close()})
+        train.prepare_data(df, cache_dir=str(tmp_path))
+
+        calls = []
+        compute_features = train.compute_features
+        def counting_compute_features(*args, **kwargs):
+            calls.append(1)
+            return compute_features(*args, **kwargs)
+        monkeypatch.setattr(train, 'compute_features', counting_compute_features)
+        monkeypatch.setattr(train, 'FEATURE_VERSION', train.FEATURE_VERSION + 1)
+        train.prepare_data(df, cache_dir=str(tmp_path))
+
+        assert len(calls) == 1
+        assert len(list(tmp_path.glob('*.parquet'))) == 2